@@ -2,21 +2,67 @@
 Main CRM Analytics Agent orchestrating the two-stage Gemini process
 """
 
+import hashlib
 import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional
 from pathlib import Path
-from dotenv import load_dotenv
-
-# Load environment variables from backend/.env
-backend_dir = Path(__file__).parent.parent
-env_path = backend_dir / ".env"
-if env_path.exists():
-    load_dotenv(env_path)
 
 from .catalog import get_catalog_summary
+from .fastjson import dumps as json_dumps, loads as json_loads
 from .data_loader import DataLoader
 from .gemini_client import GeminiAgent
 
+# Filler words ignored when fingerprinting questions for the plan cache
+_FINGERPRINT_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does",
+    "for", "from", "give", "has", "have", "how", "i", "in", "is", "it", "me",
+    "my", "of", "on", "or", "our", "please", "show", "tell", "that", "the",
+    "their", "there", "these", "this", "to", "us", "was", "we", "were",
+    "what", "which", "who", "why", "with", "you",
+}
+
+
+# Questions mentioning these terms are the ones the frequency_over_time
+# preview actually helps the planner with; everything else skips it
+_FREQUENCY_KEYWORDS = (
+    "trend", "season", "over time", "monthly", "month", "growth",
+    "forecast", "year", "history", "historical", "past", "frequency",
+)
+
+
+def _needs_frequency_preview(user_question: str) -> bool:
+    """Cheap keyword check for whether the planning prompt needs the preview"""
+    question = user_question.lower()
+    return any(keyword in question for keyword in _FREQUENCY_KEYWORDS)
+
+
+def _plan_fingerprint(user_question: str) -> frozenset:
+    """
+    Normalize a question into a bag of content words
+    Dashboard-style questions repeat with small phrasing changes; questions
+    that share a fingerprint can reuse the same data-product plan
+    """
+    tokens = "".join(
+        c if c.isalnum() else " " for c in user_question.lower()
+    ).split()
+    return frozenset(t for t in tokens if t not in _FINGERPRINT_STOPWORDS)
+
+
+def _load_env():
+    """
+    Load environment variables from backend/.env
+    Deferred to first agent construction (rather than import time) so that
+    importing the agent package stays cheap for callers that don't need it
+    """
+    from dotenv import load_dotenv
+
+    env_path = Path(__file__).parent.parent / ".env"
+    if env_path.exists():
+        load_dotenv(env_path)
+
 
 class CRMAnalyticsAgent:
     """
@@ -25,24 +71,83 @@ class CRMAnalyticsAgent:
     2. Analysis: Generate final answer with retrieved data
     """
     
-    def __init__(self, gemini_api_key: Optional[str] = None, data_dir: Optional[str] = None):
+    def __init__(
+        self,
+        gemini_api_key: Optional[str] = None,
+        data_dir: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        use_result_cache: bool = True,
+        rpm: float = 60,
+    ):
         """
         Initialize the agent
-        
+
         Args:
             gemini_api_key: Google AI API key (or reads from GEMINI_API_KEY env var)
             data_dir: Path to data directory (defaults to backend/trends/data)
+            cache_dir: Directory for cached query results (defaults to backend/agent/cache)
+            use_result_cache: If False, always re-run both Gemini stages
+            rpm: Requests-per-minute budget for pacing Gemini calls
         """
-        self.gemini_agent = GeminiAgent(api_key=gemini_api_key)
+        _load_env()
+        self.gemini_agent = GeminiAgent(api_key=gemini_api_key, rpm=rpm)
         self.data_loader = DataLoader(data_dir=data_dir)
         self.catalog_summary = get_catalog_summary()
+        self.use_result_cache = use_result_cache
+        self.cache_dir = Path(cache_dir) if cache_dir else Path(__file__).parent / "cache"
+        # Memoized planner decisions: question fingerprint -> plan list
+        self._plan_cache: Dict[frozenset, list] = {}
+
+        # Prefetch the near-certain data (frequency preview, top10) in the
+        # background so the first query() doesn't pay the cold CSV parse
+        self._warmup_done = threading.Event()
+        threading.Thread(target=self._warmup, daemon=True).start()
+
+    def _warmup(self):
+        """Background prefetch of the hottest data into the loader caches"""
+        try:
+            self._get_frequency_preview()
+            self.data_loader.load_summary("frequency_over_time")
+            self.data_loader.load_product("top10_volume_30d")
+        except Exception:
+            pass  # warmup is best-effort; queries fall back to cold loads
+        finally:
+            self._warmup_done.set()
+
+    def _data_version(self) -> str:
+        """Max mtime across the data CSVs - changes whenever any source data changes"""
+        try:
+            mtimes = [f.stat().st_mtime_ns for f in self.data_loader.data_dir.glob("*.csv")]
+            return str(max(mtimes)) if mtimes else "0"
+        except OSError:
+            return "0"
+
+    def _result_cache_path(self, user_question: str) -> Path:
+        """Cache file for a question, keyed on normalized text + data version"""
+        key = hashlib.sha256(
+            (user_question.strip().lower() + "|" + self._data_version()).encode("utf-8")
+        ).hexdigest()
+        return self.cache_dir / f"{key}.json"
     
     def _get_frequency_preview(self, num_rows: int = 10) -> str:
         """Get a preview of frequency_over_time.csv for the planning stage"""
-        df = self.data_loader.load_product("frequency_over_time")
+        # Prefer the pre-generated preview (see generate_summaries.py) so the
+        # hot query path is a single small file read, not a CSV parse
+        preview_file = self.data_loader.summary_dir / "frequency_over_time_preview.txt"
+        csv_file = self.data_loader.data_dir / "frequency_over_time.csv"
+        if preview_file.exists():
+            # Only trust the preview if it's at least as new as the source CSV
+            if not csv_file.exists() or preview_file.stat().st_mtime >= csv_file.stat().st_mtime:
+                try:
+                    return preview_file.read_text(encoding='utf-8')
+                except Exception:
+                    pass
+
+        # Cold fallback: read just the preview rows rather than the full table
+        df = self.data_loader.load_product_head("frequency_over_time", n=num_rows)
         if df is None:
             return "Frequency data not available"
-        
+
         return self.data_loader.get_data_summary(df, max_rows=num_rows)
     
     def query(self, user_question: str, verbose: bool = True) -> Dict[str, Any]:
@@ -66,87 +171,138 @@ class CRMAnalyticsAgent:
             }
         """
         
-        if verbose:
-            print(f"\n{'='*80}")
-            print(f"QUESTION: {user_question}")
-            print(f"{'='*80}\n")
-        
-        # STAGE 1: Planning
-        if verbose:
-            print("🤔 Stage 1: Planning which data products to use...")
-        
-        frequency_preview = self._get_frequency_preview()
-        plan = self.gemini_agent.plan_stage(
-            user_question=user_question,
-            catalog_summary=self.catalog_summary,
-            frequency_data_preview=frequency_preview
-        )
-        
-        if verbose:
-            print(f"\n📋 Plan generated:")
-            for item in plan:
-                print(f"   - {item['product']}: {item['why']}")
-            print()
-        
-        # STAGE 2: Fetch data products (using summaries if available)
-        if verbose:
-            print("📊 Stage 2: Fetching data products...")
-        
-        product_ids = [item["product"] for item in plan]
-        
-        # Try to load pre-generated summaries first (much faster!)
-        fetched_data_summaries = self.data_loader.load_multiple_summaries(product_ids)
-        
-        if verbose:
-            print(f"   Loaded {len(fetched_data_summaries)} data products")
-            for product_id in fetched_data_summaries.keys():
-                # Check if it was from a pre-generated summary
-                summary_exists = (self.data_loader.summary_dir / f"{product_id}.txt").exists()
-                marker = "📄" if summary_exists else "💾"
-                print(f"   {marker} {product_id}")
-            print()
-        
-        # STAGE 3: Analysis
-        if verbose:
-            print("🧠 Stage 3: Generating final analysis...")
-        
-        result = self.gemini_agent.analysis_stage(
-            user_question=user_question,
-            access_log=plan,
-            fetched_data=fetched_data_summaries
-        )
-        
-        if verbose:
-            print(f"\n{'='*80}")
-            print("✨ FINAL ANSWER")
-            print(f"{'='*80}")
-            print(f"\n{result.get('answer', 'No answer generated')}\n")
-            
-            if 'rationale' in result:
-                print("📌 RATIONALE:")
-                for point in result['rationale']:
-                    print(f"   • {point}")
-                print()
-            
-            if 'key_metrics' in result:
-                print("🔢 KEY METRICS:")
-                for metric in result['key_metrics']:
-                    print(f"   • {metric}")
-                print()
-            
-            print(f"{'='*80}\n")
-        
-        # Compile complete response
-        complete_response = {
-            "question": user_question,
-            "plan": plan,
-            "fetched_products": list(fetched_data_summaries.keys()),
-            "answer": result.get("answer", ""),
-            "rationale": result.get("rationale", []),
-            "key_metrics": result.get("key_metrics", []),
-        }
-        
-        return complete_response
+        # Warm hit: return the persisted result without any LLM call. The key
+        # includes the data mtimes, so edits to the CSVs invalidate old entries.
+        cache_path = self._result_cache_path(user_question) if self.use_result_cache else None
+        if cache_path and cache_path.exists():
+            try:
+                cached_response = json_loads(cache_path.read_text(encoding='utf-8'))
+                if verbose:
+                    print(f"\n💾 Returning cached result for: {user_question}")
+                return cached_response
+            except Exception:
+                pass  # corrupt cache entry: fall through and recompute
+
+        # Verbose progress is buffered and flushed as one stdout write at the
+        # end, so a query costs one write syscall instead of dozens and the
+        # output stays atomic when questions run concurrently
+        log = []
+        try:
+            if verbose:
+                log.append(f"\n{'='*80}")
+                log.append(f"QUESTION: {user_question}")
+                log.append(f"{'='*80}\n")
+
+            # STAGE 1: Planning
+            if verbose:
+                log.append("🤔 Stage 1: Planning which data products to use...")
+
+            # Questions with the same content-word fingerprint reuse the cached
+            # plan, skipping the Gemini planning round-trip entirely
+            fingerprint = _plan_fingerprint(user_question)
+            plan = self._plan_cache.get(fingerprint)
+
+            if plan is not None:
+                if verbose:
+                    log.append("   💾 Reusing cached plan for similar question")
+            else:
+                # Give the init-time warmup a moment to finish so the preview and
+                # top10 loads below hit warm caches instead of racing a cold parse
+                self._warmup_done.wait(timeout=5)
+
+                # Only build the frequency preview for questions it can inform
+                if _needs_frequency_preview(user_question):
+                    frequency_preview = self._get_frequency_preview()
+                else:
+                    frequency_preview = "(frequency preview omitted - not relevant to this question)"
+                plan = self.gemini_agent.plan_stage(
+                    user_question=user_question,
+                    catalog_summary=self.catalog_summary,
+                    frequency_data_preview=frequency_preview
+                )
+                if fingerprint:
+                    self._plan_cache[fingerprint] = plan
+
+            if verbose:
+                log.append(f"\n📋 Plan generated:")
+                for item in plan:
+                    log.append(f"   - {item['product']}: {item['why']}")
+                log.append("")
+
+            # STAGE 2: Fetch data products (using summaries if available)
+            if verbose:
+                log.append("📊 Stage 2: Fetching data products...")
+
+            product_ids = [item["product"] for item in plan]
+
+            # Try to load pre-generated summaries first (much faster!)
+            summaries_with_sources = self.data_loader.load_multiple_summaries_with_sources(product_ids)
+            fetched_data_summaries = {
+                product_id: summary for product_id, (summary, _) in summaries_with_sources.items()
+            }
+
+            if verbose:
+                log.append(f"   Loaded {len(fetched_data_summaries)} data products")
+                for product_id, (_, source) in summaries_with_sources.items():
+                    # The loader already knows whether this was a pre-generated summary
+                    marker = "📄" if source == "summary" else "💾"
+                    log.append(f"   {marker} {product_id}")
+                log.append("")
+
+            # STAGE 3: Analysis
+            if verbose:
+                log.append("🧠 Stage 3: Generating final analysis...")
+
+            result = self.gemini_agent.analysis_stage(
+                user_question=user_question,
+                access_log=plan,
+                fetched_data=fetched_data_summaries
+            )
+
+            if verbose:
+                log.append(f"\n{'='*80}")
+                log.append("✨ FINAL ANSWER")
+                log.append(f"{'='*80}")
+                log.append(f"\n{result.get('answer', 'No answer generated')}\n")
+
+                if 'rationale' in result:
+                    log.append("📌 RATIONALE:")
+                    for point in result['rationale']:
+                        log.append(f"   • {point}")
+                    log.append("")
+
+                if 'key_metrics' in result:
+                    log.append("🔢 KEY METRICS:")
+                    for metric in result['key_metrics']:
+                        log.append(f"   • {metric}")
+                    log.append("")
+
+                log.append(f"{'='*80}\n")
+
+            # Compile complete response
+            complete_response = {
+                "question": user_question,
+                "plan": plan,
+                "fetched_products": list(fetched_data_summaries.keys()),
+                "answer": result.get("answer", ""),
+                "rationale": result.get("rationale", []),
+                "key_metrics": result.get("key_metrics", []),
+            }
+
+            if cache_path:
+                try:
+                    # Atomic write so a crash mid-dump never leaves a corrupt entry
+                    self.cache_dir.mkdir(exist_ok=True)
+                    tmp_path = cache_path.with_suffix(".json.tmp")
+                    tmp_path.write_text(json_dumps(complete_response), encoding='utf-8')
+                    os.replace(tmp_path, cache_path)
+                except Exception as e:
+                    log.append(f"Warning: could not write result cache: {e}")
+
+            return complete_response
+        finally:
+            if log:
+                sys.stdout.write("\n".join(log) + "\n")
     
     def batch_query(self, questions: list, verbose: bool = True) -> list:
         """
@@ -169,9 +325,32 @@ class CRMAnalyticsAgent:
             
             result = self.query(question, verbose=verbose)
             results.append(result)
-        
+
         return results
 
+    def batch_query_concurrent(self, questions: list, max_concurrency: int = 8) -> list:
+        """
+        Process multiple questions concurrently
+
+        Each question still issues its own plan + analysis Gemini calls, but
+        the questions run in parallel so a batch takes roughly the latency of
+        the slowest question instead of the sum of all of them. Output order
+        matches the input order.
+
+        Args:
+            questions: List of question strings
+            max_concurrency: Maximum number of questions processed at once
+
+        Returns:
+            List of response dictionaries (same order as questions)
+        """
+        if not questions:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(len(questions), max_concurrency)) as executor:
+            # verbose=False: interleaved progress output from parallel workers is unreadable
+            return list(executor.map(lambda q: self.query(q, verbose=False), questions))
+
 
 # Example usage function
 def main():
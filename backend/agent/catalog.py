@@ -3,6 +3,8 @@ Data Catalog for CRM Service Request Analytics
 Describes all available data products and their purposes
 """
 
+import functools
+
 DATA_CATALOG = {
     "top10_volume_30d": {
         "file": "top10.csv",
@@ -93,22 +95,59 @@ DATA_CATALOG = {
         "description": "Priority matrix combining volume and time-to-close (P90)",
         "filter": None,
         "use_cases": ["prioritization", "strategic planning", "resource optimization"],
-        "metrics": ["volume", "p90_days", "quadrant assignment"]
+        "metrics": ["volume", "p90_days", "quadrant assignment"],
+        # Projection for summaries: bubble_size is a frontend display value
+        "columns": ["group", "request_count", "time_to_close_days", "open_count",
+                    "recent_volume", "closed_count", "priority_category"]
     }
 }
+# Entries may declare a "columns" projection list; products without one load
+# every column. The filter column (if any) must be included in the projection.
 
 
+@functools.cache
 def get_catalog_summary() -> str:
-    """Generate a human-readable summary of the data catalog"""
-    summary = "## Available Data Products\n\n"
-    
+    """
+    Generate a human-readable summary of the data catalog
+    The catalog is constant for the life of the process, so the summary is
+    built once and cached instead of being rebuilt on every agent init
+    """
+    parts = ["## Available Data Products\n"]
+
     for product_id, details in DATA_CATALOG.items():
-        summary += f"**{product_id}**\n"
-        summary += f"- Description: {details['description']}\n"
-        summary += f"- Use Cases: {', '.join(details['use_cases'])}\n"
-        summary += f"- Key Metrics: {', '.join(details['metrics'])}\n\n"
-    
-    return summary
+        parts.append(
+            f"**{product_id}**\n"
+            f"- Description: {details['description']}\n"
+            f"- Use Cases: {', '.join(details['use_cases'])}\n"
+            f"- Key Metrics: {', '.join(details['metrics'])}\n"
+        )
+
+    return "\n".join(parts) + "\n"
+
+
+def _compile_filter(filter_str: str):
+    """
+    Parse a simple "column == 'value'" filter string into (column, value)
+    Returns None for anything more complex than a single equality
+    """
+    if filter_str and "==" in filter_str:
+        left, _, right = filter_str.partition("==")
+        return left.strip(), right.strip().strip("'\"")
+    return None
+
+
+# Filter strings are constants, so compile them once at import instead of
+# paying the pandas expression parser on every load
+_COMPILED_FILTERS = {
+    product_id: _compile_filter(details["filter"])
+    for product_id, details in DATA_CATALOG.items()
+    if details["filter"]
+}
+
+
+def get_compiled_filter(product_id: str):
+    """Get the precompiled (column, value) filter for a product, if any"""
+    return _COMPILED_FILTERS.get(product_id)
 
 
 def get_product_details(product_id: str) -> dict:
@@ -2,11 +2,78 @@
 Data loader utilities for fetching data products
 """
 
-import pandas as pd
+from __future__ import annotations
+
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any
-from .catalog import DATA_CATALOG, get_product_details
+from typing import Optional, Dict, Any, TYPE_CHECKING
+from .catalog import DATA_CATALOG, get_compiled_filter, get_product_details
+
+# pandas is imported lazily inside the loaders so importing the agent package
+# doesn't pay the full pandas import cost unless data is actually loaded
+if TYPE_CHECKING:
+    import pandas as pd
+
+# In-process cache of filtered DataFrames keyed by (product_id, file mtime_ns).
+# Keeps repeated queries against the same small set of CSVs from re-reading and
+# re-parsing them; entries go stale automatically when the file mtime changes.
+_DF_CACHE: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
+_DF_CACHE_MAX_SIZE = 32
+# The parallel loaders (load_multiple_*, warmup, summary generation) call
+# load_product from worker threads; OrderedDict iteration/eviction isn't safe
+# against concurrent inserts, so all cache access goes through this lock
+_DF_CACHE_LOCK = threading.Lock()
+
+
+def clear_cache():
+    """Clear the in-memory DataFrame cache (e.g. after regenerating data files)"""
+    with _DF_CACHE_LOCK:
+        _DF_CACHE.clear()
+
+
+def _read_csv_arrow(file_path: Path, columns: Optional[list] = None) -> "pd.DataFrame":
+    """
+    Parse a CSV with pyarrow's multi-threaded C++ reader
+    Noticeably faster than pd.read_csv on the larger tables; the conversion
+    back to pandas is near zero-copy (split_blocks + self_destruct)
+    """
+    from pyarrow import csv as pa_csv
+
+    table = pa_csv.read_csv(
+        str(file_path),
+        read_options=pa_csv.ReadOptions(use_threads=True, block_size=1 << 20),
+        convert_options=pa_csv.ConvertOptions(include_columns=columns) if columns else None,
+    )
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def _load_parquet(parquet_path: Path, filter_str: Optional[str], compiled_filter=None,
+                  columns: Optional[list] = None) -> pd.DataFrame:
+    """
+    Load a Parquet file (or partitioned directory) with filter pushdown.
+    Partitioned datasets (e.g. top10.parquet/ranking_type=...) only read the
+    matching partition instead of scanning the whole table.
+    """
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(str(parquet_path), format="parquet", partitioning="hive")
+
+    expr = None
+    if compiled_filter:
+        column, value = compiled_filter
+        expr = pc.field(column) == value
+
+    df = dataset.to_table(filter=expr, columns=columns).to_pandas()
+
+    # Fall back to pandas filtering if pushdown wasn't possible
+    if filter_str and compiled_filter is None:
+        df = df.query(filter_str)
+
+    return df
 
 
 class DataLoader:
@@ -22,6 +89,19 @@ class DataLoader:
         
         self.use_summaries = use_summaries
         self.summary_dir = self.data_dir / "summaries"
+        # Summary Paths are built once here; rebuilding them per lookup costs
+        # an allocation per product on every (cache-hit) load
+        self._summary_paths = {
+            product_id: self.summary_dir / f"{product_id}.txt" for product_id in DATA_CATALOG
+        }
+
+    def summary_path_for(self, product_id: str) -> Path:
+        """Path of the pre-generated summary file for a product"""
+        path = self._summary_paths.get(product_id)
+        if path is None:
+            path = self.summary_dir / f"{product_id}.txt"
+            self._summary_paths[product_id] = path
+        return path
     
     def load_product(self, product_id: str) -> Optional[pd.DataFrame]:
         """
@@ -40,26 +120,140 @@ class DataLoader:
             return None
         
         file_path = self.data_dir / product_details["file"]
-        
-        if not file_path.exists():
+
+        # Prefer a Parquet version when one exists (see scripts/convert_to_parquet.py)
+        parquet_path = file_path.with_suffix(".parquet")
+        use_parquet = parquet_path.exists()
+
+        if not use_parquet and not file_path.exists():
             print(f"Data file not found: {file_path}")
             return None
-        
+
         try:
-            # Load the CSV file
-            df = pd.read_csv(file_path)
-            
-            # Apply filter if specified
-            if product_details["filter"]:
-                # This is a simple string filter - for more complex, use eval carefully
-                df = df.query(product_details["filter"])
-            
+            # Check the in-memory cache first (keyed on mtime so edits invalidate)
+            mtime = (parquet_path if use_parquet else file_path).stat().st_mtime_ns
+            cache_key = (product_id, mtime)
+
+            with _DF_CACHE_LOCK:
+                cached = _DF_CACHE.get(cache_key)
+                if cached is not None:
+                    _DF_CACHE.move_to_end(cache_key)
+                    return cached
+
+            import pandas as pd
+
+            compiled_filter = get_compiled_filter(product_id)
+            # Optional catalog projection: skip parsing columns summaries never use
+            columns = product_details.get("columns")
+
+            if use_parquet:
+                # Columnar read with filter pushdown (partition pruning for top10)
+                df = _load_parquet(parquet_path, product_details["filter"], compiled_filter,
+                                   columns=columns)
+            else:
+                # On-disk Feather cache of the parsed (and filtered) result.
+                # The in-memory cache above only helps within one process;
+                # this survives across CLI runs (generate, then regenerate)
+                # and decodes far faster than re-parsing the CSV.
+                feather_path = self.data_dir / ".cache" / f"{product_id}.feather"
+                if (
+                    feather_path.exists()
+                    and feather_path.stat().st_mtime_ns >= mtime
+                ):
+                    try:
+                        df = pd.read_feather(feather_path)
+                        with _DF_CACHE_LOCK:
+                            _DF_CACHE[cache_key] = df
+                        return df
+                    except Exception:
+                        pass  # corrupt/stale cache file; fall through to the CSV
+
+                # Load the CSV file (pyarrow's threaded parser when available)
+                try:
+                    df = _read_csv_arrow(file_path, columns)
+                except ImportError:
+                    df = pd.read_csv(file_path, usecols=columns)
+
+                # Apply filter if specified
+                if product_details["filter"]:
+                    if compiled_filter:
+                        # Precompiled equality filter: direct C-level comparison,
+                        # no pandas expression parsing per load
+                        column, value = compiled_filter
+                        df = df[df[column].values == value]
+                    else:
+                        # This is a simple string filter - for more complex, use eval carefully
+                        df = df.query(product_details["filter"])
+
+                # Refresh the Feather cache (best effort; requires pyarrow)
+                try:
+                    feather_path.parent.mkdir(exist_ok=True)
+                    df.reset_index(drop=True).to_feather(feather_path)
+                except Exception:
+                    pass
+
+            # Drop any stale entries for this product (old mtimes), then cache
+            with _DF_CACHE_LOCK:
+                for key in [k for k in _DF_CACHE if k[0] == product_id]:
+                    del _DF_CACHE[key]
+                _DF_CACHE[cache_key] = df
+                while len(_DF_CACHE) > _DF_CACHE_MAX_SIZE:
+                    _DF_CACHE.popitem(last=False)
+
             return df
-        
+
         except Exception as e:
             print(f"Error loading {product_id}: {str(e)}")
             return None
     
+    def load_product_head(self, product_id: str, n: int = 10) -> Optional[pd.DataFrame]:
+        """
+        Load only the first n rows of a data product
+
+        Reads just n rows from disk for unfiltered CSV products (previews don't
+        need the whole multi-year table parsed). Filtered or cached products go
+        through load_product and are truncated afterwards.
+
+        Args:
+            product_id: The product identifier from the catalog
+            n: Number of rows to load
+
+        Returns:
+            DataFrame with at most n rows, or None if not found
+        """
+        product_details = get_product_details(product_id)
+
+        if not product_details:
+            print(f"Product '{product_id}' not found in catalog")
+            return None
+
+        file_path = self.data_dir / product_details["file"]
+        parquet_path = file_path.with_suffix(".parquet")
+
+        # Truncated reads only help when nothing is cached and no filter applies;
+        # otherwise reuse the (cached) full load
+        mtime_key = None
+        if file_path.exists():
+            mtime_key = (product_id, file_path.stat().st_mtime_ns)
+        with _DF_CACHE_LOCK:
+            cached_full = mtime_key in _DF_CACHE
+        if (
+            product_details["filter"] is None
+            and not parquet_path.exists()
+            and file_path.exists()
+            and not cached_full
+        ):
+            try:
+                import pandas as pd
+
+                return pd.read_csv(file_path, nrows=n, usecols=product_details.get("columns"))
+            except Exception as e:
+                print(f"Error loading head of {product_id}: {str(e)}")
+                return None
+
+        df = self.load_product(product_id)
+        return df.head(n) if df is not None else None
+
     def load_summary(self, product_id: str) -> Optional[str]:
         """
         Load a pre-generated summary for a data product
@@ -72,9 +266,9 @@ class DataLoader:
         """
         if not self.use_summaries:
             return None
-        
-        summary_file = self.summary_dir / f"{product_id}.txt"
-        
+
+        summary_file = self.summary_path_for(product_id)
+
         if not summary_file.exists():
             return None
         
@@ -86,49 +280,86 @@ class DataLoader:
     
     def load_multiple_products(self, product_ids: list) -> Dict[str, pd.DataFrame]:
         """
-        Load multiple data products
-        
+        Load multiple data products in parallel (loads are independent and
+        mostly I/O-bound, so file reads and CSV parses overlap)
+
         Args:
             product_ids: List of product identifiers
-            
+
         Returns:
             Dictionary mapping product_id to DataFrame
         """
         results = {}
-        
-        for product_id in product_ids:
-            df = self.load_product(product_id)
-            if df is not None:
-                results[product_id] = df
-        
+
+        if not product_ids:
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(len(product_ids), 8)) as executor:
+            for product_id, df in zip(product_ids, executor.map(self.load_product, product_ids)):
+                if df is not None:
+                    results[product_id] = df
+
         return results
-    
+
+    def _load_one_summary_or_fallback(self, product_id: str):
+        """
+        Load a pre-generated summary, falling back to load + summarize
+
+        Returns:
+            Tuple of (summary_text or None, source) where source is "summary"
+            for a pre-generated file and "fallback" for a live load
+        """
+        summary = self.load_summary(product_id)
+        if summary is not None:
+            return summary, "summary"
+
+        df = self.load_product(product_id)
+        if df is not None:
+            return self.get_data_summary(df), "fallback"
+        return None, "fallback"
+
+    def load_multiple_summaries_with_sources(self, product_ids: list) -> Dict[str, tuple]:
+        """
+        Load summaries for multiple data products in parallel, keeping track
+        of whether each came from a pre-generated file or a live fallback
+        (so callers don't have to re-stat the summary files to find out)
+
+        Args:
+            product_ids: List of product identifiers
+
+        Returns:
+            Dictionary mapping product_id to (summary string, source) where
+            source is "summary" or "fallback"
+        """
+        results = {}
+
+        if not product_ids:
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(len(product_ids), 8)) as executor:
+            for product_id, (summary, source) in zip(
+                product_ids, executor.map(self._load_one_summary_or_fallback, product_ids)
+            ):
+                if summary is not None:
+                    results[product_id] = (summary, source)
+
+        return results
+
     def load_multiple_summaries(self, product_ids: list) -> Dict[str, str]:
         """
-        Load pre-generated summaries for multiple data products
+        Load pre-generated summaries for multiple data products in parallel
         Falls back to loading and summarizing data if summary doesn't exist
-        
+
         Args:
             product_ids: List of product identifiers
-            
+
         Returns:
             Dictionary mapping product_id to summary string
         """
-        results = {}
-        
-        for product_id in product_ids:
-            # Try to load pre-generated summary first
-            summary = self.load_summary(product_id)
-            
-            if summary is not None:
-                results[product_id] = summary
-            else:
-                # Fall back to loading and summarizing the data
-                df = self.load_product(product_id)
-                if df is not None:
-                    results[product_id] = self.get_data_summary(df)
-        
-        return results
+        return {
+            product_id: summary
+            for product_id, (summary, _) in self.load_multiple_summaries_with_sources(product_ids).items()
+        }
     
     def get_data_summary(self, df: pd.DataFrame, max_rows: int = 20, from_end: bool = False) -> str:
         """
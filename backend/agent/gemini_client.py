@@ -2,26 +2,402 @@
 Gemini AI client for the two-stage prompting system
 """
 
+import asyncio
+import functools
+import hashlib
+import logging
 import os
-import json
-from typing import List, Dict, Any, Optional
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, TypedDict
 from pathlib import Path
-from dotenv import load_dotenv
-from google import genai
+
+from .fastjson import JSONDecodeError, dumps as json_dumps, loads as json_loads
+
+# google.genai (and dotenv in _load_env) are imported lazily on first
+# GeminiAgent construction: importing this package for pure CSV/data work
+# shouldn't pay the SDK's import cost, and cold starts get first bytes sooner
+
+# Static instruction prose lives in system_instruction rather than being
+# re-sent inside contents on every call: the instructions form a stable prefix
+# the API can context-cache, and billed prompt tokens shrink to the dynamic
+# question/data payload
+_SYS_PLAN = """You are a data analyst planning how to answer a user's question about CRM service requests.
+
+Your task is to determine which data products would be most helpful to answer the user's question.
+
+IMPORTANT: Return ONLY a valid JSON array with no additional text, markdown formatting, or code blocks. The response must be parseable JSON.
+
+Output format (JSON array only):
+[
+  {
+    "product": "product_id_from_catalog",
+    "why": "Brief reason why this data is needed"
+  },
+  {
+    "product": "another_product_id",
+    "why": "Another brief reason"
+  }
+]
+
+Select 1-3 most relevant data products. Be strategic - choose products that directly answer the question.
+Keep each "why" to one short phrase (under 10 words).
+Return only the JSON array, nothing else."""
+
+_SYS_ANALYSIS = """You are a data analyst providing insights on CRM service request data.
+
+Based on the data provided, answer the user's question as briefly as possible.
+
+Format your response as a JSON object with these keys:
+- "answer": One or two short sentences max. Be as short as possible.
+- "rationale": 1-3 brief bullet points with key numbers only.
+- "key_metrics": Short list of numbers referenced (e.g., ["663", "18.5%"]).
+
+IMPORTANT: Keep every part minimal. Return ONLY valid JSON with no additional text, markdown, or code blocks.
+
+Example format:
+{
+  "answer": "Recreation leads with 663 requests (18.5%). Roads/traffic second at 562 (15.7%).",
+  "rationale": ["Recreation 663 (18.5%)", "Roads 562 (15.7%)"],
+  "key_metrics": ["663", "18.5%", "562", "15.7%"]
+}"""
+
+_SYS_PLAN_AND_ANALYZE = """You are a data analyst answering a user's question about CRM service requests.
+
+You are given the data product catalog and summaries for every product. Do BOTH of these in a single response:
+1. Decide which 1-3 data products are most relevant to the question (the "plan").
+2. Answer the question using ONLY those products' data, as briefly as possible.
+
+Format your response as a JSON object with these keys:
+- "plan": Array of 1-3 objects {"product": "product_id_from_catalog", "why": "Brief reason (under 10 words)"}.
+- "answer": One or two short sentences max. Be as short as possible.
+- "rationale": 1-3 brief bullet points with key numbers only.
+- "key_metrics": Short list of numbers referenced (e.g., ["663", "18.5%"]).
+
+IMPORTANT: Keep every part minimal. Return ONLY valid JSON with no additional text, markdown, or code blocks."""
+
+_SYS_KEYWORDS = """You are helping prepare a search query for matching a user message against municipal service request cluster labels (e.g. "Facility Booking", "City Hall Room Booking", "Parks", "Roads").
+
+Output a single short phrase (5–15 words) that captures the key concepts for semantic search. Use terms that would match cluster labels: facility, booking, city hall, room, parks, roads, complaints, reservations, etc. No quotes or explanation—only the search phrase."""
+
+_SYS_CLUSTER_PLAN = """You are a data analyst. The user is viewing a cluster on a dashboard.
+
+Choose the SINGLE most relevant data product to show on an analytics dashboard for this cluster.
+
+IMPORTANT: Return ONLY a valid JSON array with exactly ONE object. No other text.
+Output format: [{ "product": "product_id_from_catalog", "why": "Brief reason" }]
+
+Pick ONE product that best fits this cluster. Valid product IDs include: frequency_over_time, backlog_ranked_list, backlog_distribution, priority_quadrant, geographic_hot_spots, time_to_close.
+Return only the JSON array."""
+
+_SYS_DISCUSS = """You are an assistant to the Mayor. The user just opened an analytics view after viewing a cluster.
+
+Write 1-3 short sentences that either:
+- Explain how this analytics view relates to that cluster (if there is a clear link), or
+- Discuss general trends from the data (if the link is weak).
+
+Be concise and natural. No bullet points. Output only the paragraph."""
+
+_SYS_REPORT = """You are preparing structured data for a CRM analytics PDF report that includes metrics analysis and graphs.
+
+You are given a cluster context and a discussion text. Output a JSON object with exactly these keys:
+
+- "answer": One or two sentences summarizing the main finding (use the discussion as the basis).
+- "rationale": Array of 2-5 short bullet-point strings with specific insights and numbers (e.g. "Recreation leads with 663 requests (18.5%)", "Roads second with 562 requests (15.68%)").
+- "key_metrics": Array of metric strings that MUST include the category name so charts can be generated. Use these exact patterns:
+  * For volume: "X requests in CategoryName" or "X recent requests in CategoryName" (e.g. "663 recent requests in Recreation and leisure")
+  * For growth: "X% growth in CategoryName" (e.g. "73.1% growth in Recreation and leisure")
+  * For increase: "X requests increase in CategoryName" (e.g. "280 requests increase in Recreation and leisure")
+  * For percentage of total: "X% in CategoryName" (e.g. "18.5% in Recreation and leisure")
+  Include 5-12 key_metrics covering the main categories and numbers from the discussion. Each metric string must contain both a number and a category name (e.g. "Recreation and leisure", "Roads, traffic and sidewalks", "Trees").
+
+Example key_metrics format:
+["663 recent requests in Recreation and leisure", "18.5% in Recreation and leisure", "73.1% growth in Recreation and leisure", "562 recent requests in Roads, traffic and sidewalks", "15.68% in Roads, traffic and sidewalks", "280 requests increase in Recreation and leisure"]
+
+Return ONLY valid JSON, no markdown or code fences."""
+
+_SYS_SIMPLE_CHAT = """You are an intelligent assistant to the Mayor, specializing in municipal service requests and CRM data.
+
+You have knowledge about:
+- Municipal service request categories (roads, traffic, sidewalks, recreation, parks, etc.)
+- Service request lifecycle and management
+- Common municipal operations and priorities
+- How cities handle citizen requests and complaints
+
+The user is asking you a question. Reply in 1-3 short sentences only. Be as brief as possible while still helpful. No long explanations.
+
+If the user asks about specific data or analytics, say they can use "analysis" for deep data analysis."""
+
+@functools.lru_cache(maxsize=None)
+def _get_configs() -> Dict[str, Any]:
+    """
+    Build the per-method GenerateContentConfig objects on first use
+
+    Structured-output schemas: with response_mime_type="application/json" and
+    a response_schema, Gemini returns validated JSON directly instead of prose
+    that may be wrapped in ``` fences - fewer generated tokens and no string
+    surgery. Built lazily (and once) so the google.genai import stays off the
+    module-import path.
+    """
+    from google.genai import types
+
+    string = types.Schema(type=types.Type.STRING)
+    string_array = types.Schema(type=types.Type.ARRAY, items=string)
+
+    plan_schema = types.Schema(
+        type=types.Type.ARRAY,
+        items=types.Schema(
+            type=types.Type.OBJECT,
+            properties={"product": string, "why": string},
+            required=["product", "why"],
+        ),
+    )
+
+    analysis_schema = types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "answer": string,
+            "rationale": string_array,
+            "key_metrics": string_array,
+        },
+        required=["answer", "rationale", "key_metrics"],
+    )
+
+    # The PDF-report payload has the same shape as an analysis result
+    report_schema = analysis_schema
+
+    plan_and_analyze_schema = types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "plan": plan_schema,
+            "answer": string,
+            "rationale": string_array,
+            "key_metrics": string_array,
+        },
+        required=["plan", "answer", "rationale", "key_metrics"],
+    )
+
+    def make_config(system_instruction=None, schema=None, temperature=None,
+                    max_output_tokens=None):
+        kwargs: Dict[str, Any] = {}
+        if system_instruction is not None:
+            kwargs["system_instruction"] = system_instruction
+        if schema is not None:
+            kwargs["response_mime_type"] = "application/json"
+            kwargs["response_schema"] = schema
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        if max_output_tokens is not None:
+            kwargs["max_output_tokens"] = max_output_tokens
+        return types.GenerateContentConfig(**kwargs)
+
+    # temperature=0 on the structured/classification tasks makes their
+    # outputs deterministic (and therefore safe to memoize); the
+    # max_output_tokens caps bound decode time, which scales with tokens
+    # generated. Prose methods keep the default temperature.
+    return {
+        "plan": make_config(_SYS_PLAN, plan_schema,
+                            temperature=0, max_output_tokens=256),
+        "analysis": make_config(_SYS_ANALYSIS, analysis_schema,
+                                temperature=0, max_output_tokens=512),
+        "report": make_config(_SYS_REPORT, report_schema,
+                              temperature=0, max_output_tokens=1024),
+        "plan_and_analyze": make_config(_SYS_PLAN_AND_ANALYZE, plan_and_analyze_schema,
+                                        temperature=0, max_output_tokens=768),
+        "cluster_plan": make_config(_SYS_CLUSTER_PLAN, plan_schema,
+                                    temperature=0, max_output_tokens=128),
+        "keywords": make_config(_SYS_KEYWORDS,
+                                temperature=0, max_output_tokens=64),
+        "discuss": make_config(_SYS_DISCUSS, max_output_tokens=256),
+        "simple_chat": make_config(_SYS_SIMPLE_CHAT, max_output_tokens=256),
+    }
+
+# Separator lines are constants; building "-" * n per call allocates a fresh
+# string on every request
+SEP = "-" * 80
+_LOG_SEP = "-" * 60
+
+# Cap on the data summary embedded in discuss prompts: anything beyond this
+# is billed prefill tokens that add nothing to a 1-3 sentence answer
+MAX_SUMMARY = 2000
+
+# Local prompt-size guard: an oversized prompt is rejected by the API only
+# after upload + tokenization, wasting a full round-trip. We estimate tokens
+# locally (~4 chars/token for these mostly-ASCII table dumps) and trim the
+# largest data summaries before sending. Kept far below the model's 1M
+# window so estimate error can't push us over.
+_CHARS_PER_TOKEN = 4
+MAX_PROMPT_TOKENS = 200_000
+
+
+def _estimate_tokens(text: str) -> int:
+    """Cheap local token estimate; avoids a tokenizer dependency"""
+    return len(text) // _CHARS_PER_TOKEN
+
+
+# Compiled once: matches a whole response wrapped in a ```/```json fence.
+# JSON-mode responses can't contain fences, so this only runs (and matches)
+# on the defensive fallback path
+FENCE_RE = re.compile(r"^```(?:json)?\s*\n(.*?)\n```$", re.DOTALL)
+
+
+def _strip_fence(text: str) -> str:
+    """Strip a surrounding markdown code fence, if any, in a single regex pass"""
+    text = text.strip()
+    m = FENCE_RE.match(text)
+    return m.group(1) if m else text
+
+
+def _parsed_json(response):
+    """
+    Get the structured payload from a JSON-mode response
+    Prefers the SDK's already-parsed object; falls back to parsing the text
+    (de-fenced first, in case a caller ever runs without JSON mode)
+    """
+    parsed = getattr(response, "parsed", None)
+    if parsed is not None:
+        return parsed
+    return json_loads(_strip_fence(response.text))
+
+
+
+class PlanItem(TypedDict):
+    """One entry of a retrieval plan"""
+    product: str
+    why: str
+
+
+class AnalysisResult(TypedDict):
+    """Shape of an analysis / fused plan-and-analyze answer"""
+    answer: str
+    rationale: List[str]
+    key_metrics: List[str]
+
+
+class ReportData(TypedDict):
+    """Structured payload consumed by ReportGenerator.generate_pdf"""
+    answer: str
+    rationale: List[str]
+    key_metrics: List[str]
+
+
+class PlanAndAnalyzeResult(AnalysisResult):
+    """Fused plan + analysis answer from a single round-trip"""
+    plan: List[PlanItem]
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket for pacing outbound API calls to a requests-per-
+    minute budget, so batch workloads self-pace instead of triggering 429s
+    """
+
+    def __init__(self, rate_per_min: float, capacity: Optional[float] = None):
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_min / 6)
+        self.refill_per_sec = rate_per_min / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _try_acquire(self, cost: float) -> float:
+        """Consume cost tokens if available; return 0.0 on success or seconds to wait"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.refill_per_sec
+            )
+            self.updated = now
+            if self.tokens >= cost:
+                self.tokens -= cost
+                return 0.0
+            return (cost - self.tokens) / self.refill_per_sec
+
+    def acquire(self, cost: float = 1.0):
+        """Block until cost tokens are available, then consume them"""
+        while True:
+            wait = self._try_acquire(cost)
+            if wait == 0.0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, cost: float = 1.0):
+        """Async variant of acquire: awaits instead of blocking the event loop"""
+        while True:
+            wait = self._try_acquire(cost)
+            if wait == 0.0:
+                return
+            await asyncio.sleep(wait)
+
+
+class _TTLCache:
+    """
+    Small thread-safe LRU cache whose entries expire after ttl seconds
+    Used to memoize Gemini responses for prompts that repeat within a session
+    (same cluster page, same user message) without adding a cachetools dep
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if time.monotonic() >= expires:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+def _is_rate_limit_error(e: Exception) -> bool:
+    """Detect Gemini 429 / quota-exhausted errors worth retrying"""
+    if getattr(e, "code", None) == 429 or getattr(e, "status_code", None) == 429:
+        return True
+    message = str(e)
+    return "429" in message or "RESOURCE_EXHAUSTED" in message
+
+
+logger = logging.getLogger(__name__)
 
 
 def _log_prompt_to_console(method: str, prompt: str) -> None:
-    """Log the prompt sent to Gemini to the console for debugging."""
-    print(f"\n[Gemini prompt] method={method} len={len(prompt)}")
-    print("-" * 60)
-    print(prompt)
-    print("-" * 60)
+    """
+    Log the prompt sent to Gemini for debugging
+
+    Gated behind DEBUG: prompts run to many KB (catalog + fetched data), and
+    unconditionally printing them forces a blocking stdout flush on every
+    call. At default log levels this is now a no-op.
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("[Gemini prompt] method=%s len=%d\n%s\n%s\n%s",
+                     method, len(prompt), _LOG_SEP, prompt, _LOG_SEP)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_env():
+    """Load backend/.env on first client construction instead of at import time
+    (memoized so repeated agent constructions don't re-stat the file)"""
+    from dotenv import load_dotenv
 
-# Load environment variables from backend/.env
-backend_dir = Path(__file__).parent.parent
-env_path = backend_dir / ".env"
-if env_path.exists():
-    load_dotenv(env_path)
+    env_path = Path(__file__).parent.parent / ".env"
+    if env_path.exists():
+        load_dotenv(env_path)
 
 
 class GeminiAgent:
@@ -29,215 +405,659 @@ class GeminiAgent:
     Two-stage Gemini agent for CRM analytics
     Stage 1: Planning - determines which data products to use
     Stage 2: Analysis - provides final answer based on retrieved data
+
+    Every public method also has an async counterpart (aplan_stage,
+    aanalysis_stage, ...) that uses the SDK's aio client, so async callers
+    (the FastAPI endpoints) can overlap Gemini round-trips instead of
+    blocking the event loop. Both variants share the same prompt builders,
+    response parsers and rate limiter.
     """
-    
-    def __init__(self, api_key: Optional[str] = None):
+
+    # Per-task model routing: heavyweight analysis/report prompts use flash;
+    # short classification-style tasks (keyword extraction, picking one
+    # product, brief chat) run on flash-lite for lower latency and cost
+    MODEL_FLASH = "gemini-2.5-flash"
+    MODEL_LITE = "gemini-2.5-flash-lite"
+
+    # How long a completed single-flight Future stays in the dedup table;
+    # identical prompts arriving within this window reuse the finished call
+    COALESCE_LINGER_S = 0.05
+
+    # One genai.Client per process: each client owns an HTTPS connection pool
+    # and re-reads credentials, so per-instance clients repeat TLS handshakes
+    # that a shared pool amortizes away
+    _client_singleton = None
+    _client_lock = threading.Lock()
+
+    @classmethod
+    def _get_client(cls):
+        if cls._client_singleton is None:
+            with cls._client_lock:
+                if cls._client_singleton is None:
+                    from google import genai
+                    from google.genai import types
+
+                    cls._client_singleton = genai.Client(
+                        http_options=types.HttpOptions(timeout=30_000)
+                    )
+        return cls._client_singleton
+
+    def __init__(self, api_key: Optional[str] = None, rpm: float = 60,
+                 flash_model: Optional[str] = None, lite_model: Optional[str] = None):
         """
         Initialize Gemini client
-        
+
         Args:
             api_key: Google AI API key. If None, reads from GEMINI_API_KEY env var
+            rpm: Requests-per-minute budget used to pace outbound calls
+            flash_model: Override for the heavy-task model (A/B testing)
+            lite_model: Override for the light-task model (A/B testing)
         """
+        _load_env()
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
         if not self.api_key:
             raise ValueError("Gemini API key must be provided or set in GEMINI_API_KEY environment variable")
-        
-        self.client = genai.Client()
-    
-    def plan_stage(
-        self, 
-        user_question: str, 
-        catalog_summary: str,
-        frequency_data_preview: str
-    ) -> List[Dict[str, str]]:
+
+        self.client = self._get_client()
+        self.model_flash = flash_model or self.MODEL_FLASH
+        self.model_lite = lite_model or self.MODEL_LITE
+        self._rate_limiter = TokenBucket(rate_per_min=rpm)
+        # Single-flight table (async path only): prompt hash -> (Future,
+        # completion time). completion time is None while the call is in
+        # flight; completed entries linger COALESCE_LINGER_S and are expired
+        # lazily on the next lookup
+        self._inflight: Dict[str, tuple] = {}
+        # Short-lived response memo for prompts that repeat within a session
+        # (opt-in per call site via cache=True on the generate helpers)
+        self._response_cache = _TTLCache(maxsize=1024, ttl=60.0)
+        # Longer-lived memo of extracted keyword phrases: municipal CRM
+        # queries are highly skewed, so the popular messages hit here and
+        # skip the Gemini call entirely. Keyed on a blake2b of message +
+        # context; 1h TTL bounds staleness if the prompt ever changes
+        self._keywords_text_cache = _TTLCache(maxsize=4096, ttl=3600.0)
+
+    @staticmethod
+    def _keywords_cache_key(user_message: str, context: str) -> str:
+        """Compact digest key for the keyword-phrase cache"""
+        return hashlib.blake2b(
+            f"{user_message}\x00{context}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+
+    @staticmethod
+    def _prompt_key(contents, model: str) -> Optional[str]:
+        """Hash key for caching/coalescing; None for non-string contents"""
+        if isinstance(contents, str):
+            return hashlib.sha256(f"{model}\x00{contents}".encode("utf-8")).hexdigest()
+        return None
+
+    def _generate_content(self, contents, model: Optional[str] = None, max_tries: int = 5,
+                          config=None, cache: bool = False):
         """
-        Stage 1: Planning prompt to determine which data products to use
-        
-        Args:
-            user_question: The user's original question
-            catalog_summary: Summary of available data products
-            frequency_data_preview: Preview of frequency_over_time.csv
-            
-        Returns:
-            List of dictionaries with 'product' and 'why' keys
+        Rate-limited generate_content with exponential backoff on 429s
+
+        All Gemini calls go through here so concurrent callers (batch_query,
+        parallel plan stages) share one pacing budget and a single rate-limit
+        error doesn't abort an entire batch. With cache=True the response is
+        memoized for 60s keyed on the prompt, which drops repeat traffic
+        (same cluster, same message) to zero API calls.
         """
-        
-        prompt = f"""You are a data analyst planning how to answer a user's question about CRM service requests.
+        model = model or self.model_flash
+        cache_key = self._prompt_key(contents, model) if cache else None
+        if cache_key is not None:
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-USER QUESTION:
-{user_question}
+        for attempt in range(max_tries):
+            self._rate_limiter.acquire()
+            try:
+                response = self.client.models.generate_content(model=model, contents=contents,
+                                                               config=config)
+                if cache_key is not None:
+                    self._response_cache.put(cache_key, response)
+                return response
+            except Exception as e:
+                if attempt < max_tries - 1 and _is_rate_limit_error(e):
+                    # Exponential backoff with full jitter
+                    delay = random.uniform(0, min(2 ** attempt, 30))
+                    print(f"Gemini rate limited; retrying in {delay:.1f}s "
+                          f"(attempt {attempt + 1}/{max_tries})")
+                    time.sleep(delay)
+                    continue
+                raise
+
+    async def _agenerate_content(self, contents, model: Optional[str] = None, max_tries: int = 5,
+                                 config=None, cache: bool = False):
+        """
+        Async counterpart of _generate_content using the non-blocking aio
+        client. Shares the token bucket with the sync path so mixed workloads
+        still respect one requests-per-minute budget.
+
+        Identical concurrent prompts are coalesced into a single real call:
+        the same cluster page open in several browsers fires N identical
+        requests, and only the first one is billed - the rest await its
+        Future (single-flight dedup keyed on sha256 of model + prompt).
+        With cache=True completed responses are additionally memoized for 60s
+        in the same TTL cache the sync path uses.
+        """
+        model = model or self.model_flash
+        key = self._prompt_key(contents, model)
+        if key is not None:
+            if cache:
+                cached = self._response_cache.get(key)
+                if cached is not None:
+                    return cached
+
+            existing = self._inflight.get(key)
+            if existing is not None:
+                fut, done_at = existing
+                if done_at is None:
+                    # Still in flight: wait on the owner's Future
+                    return await asyncio.shield(fut)
+                if time.monotonic() - done_at < self.COALESCE_LINGER_S:
+                    # Completed within the coalescing window: reuse the result.
+                    # Expiry happens here on read (no loop timer, so entries
+                    # from a since-closed event loop can't outlive the window)
+                    return fut.result()
+                self._inflight.pop(key, None)
+
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = (future, None)
+            try:
+                result = await self._agenerate_uncoalesced(contents, model, max_tries, config)
+                future.set_result(result)
+                if cache:
+                    self._response_cache.put(key, result)
+                # Keep the resolved Future visible for a short coalescing
+                # window so a burst of identical requests that straddles
+                # completion still shares this round-trip
+                self._inflight[key] = (future, time.monotonic())
+                return result
+            except BaseException as e:
+                # BaseException so CancelledError (client disconnected mid
+                # call) also wakes waiters and clears the entry; otherwise
+                # later identical prompts would await the orphaned Future
+                # forever
+                if isinstance(e, Exception):
+                    future.set_exception(e)
+                    future.exception()  # mark retrieved even when no one else awaits
+                else:
+                    future.cancel()
+                self._inflight.pop(key, None)
+                raise
+
+        return await self._agenerate_uncoalesced(contents, model, max_tries, config)
+
+    async def _agenerate_uncoalesced(self, contents, model: Optional[str] = None,
+                                     max_tries: int = 5, config=None):
+        """The actual rate-limited aio call with 429 backoff (no dedup)"""
+        model = model or self.model_flash
+        for attempt in range(max_tries):
+            await self._rate_limiter.acquire_async()
+            try:
+                return await self.client.aio.models.generate_content(model=model, contents=contents,
+                                                                     config=config)
+            except Exception as e:
+                if attempt < max_tries - 1 and _is_rate_limit_error(e):
+                    delay = random.uniform(0, min(2 ** attempt, 30))
+                    print(f"Gemini rate limited; retrying in {delay:.1f}s "
+                          f"(attempt {attempt + 1}/{max_tries})")
+                    await asyncio.sleep(delay)
+                    continue
+                raise
 
-AVAILABLE DATA PRODUCTS:
+    def _generate_content_stream(self, contents, model: Optional[str] = None, config=None):
+        """Rate-limited streaming generate_content (sync); yields SDK chunks"""
+        model = model or self.model_flash
+        self._rate_limiter.acquire()
+        return self.client.models.generate_content_stream(
+            model=model, contents=contents, config=config
+        )
+
+    async def _agenerate_content_stream(self, contents, model: Optional[str] = None,
+                                        config=None):
+        """Rate-limited streaming generate_content (async); yields SDK chunks"""
+        model = model or self.model_flash
+        await self._rate_limiter.acquire_async()
+        async for chunk in await self.client.aio.models.generate_content_stream(
+            model=model, contents=contents, config=config
+        ):
+            yield chunk
+
+    # ------------------------------------------------------------------
+    # Prompt builders / response parsers shared by sync and async variants
+    # ------------------------------------------------------------------
+
+    def _build_plan_prompt(
+        self,
+        user_question: str,
+        catalog_summary: str,
+        frequency_data_preview: str,
+    ) -> str:
+        # Instructions live in _SYS_PLAN (system_instruction); contents carry
+        # only the data. Static content (catalog + preview) goes first and the
+        # variable user question last, so Gemini's implicit prompt caching can
+        # reuse the shared prefix across questions
+        return f"""AVAILABLE DATA PRODUCTS:
 {catalog_summary}
 
 SAMPLE DATA (frequency_over_time.csv preview):
 {frequency_data_preview}
 
-Your task is to determine which data products would be most helpful to answer the user's question.
+USER QUESTION:
+{user_question}"""
 
-IMPORTANT: Return ONLY a valid JSON array with no additional text, markdown formatting, or code blocks. The response must be parseable JSON.
+    def _parse_plan_response(self, response) -> List[PlanItem]:
+        try:
+            return _parsed_json(response)
 
-Output format (JSON array only):
-[
-  {{
-    "product": "product_id_from_catalog",
-    "why": "Brief reason why this data is needed"
-  }},
-  {{
-    "product": "another_product_id",
-    "why": "Another brief reason"
-  }}
-]
+        except JSONDecodeError as e:
+            print(f"Error parsing JSON response: {e}")
+            print(f"Raw response: {response.text}")
+            # Return a default fallback
+            return [
+                {"product": "top10_volume_30d", "why": "Identify highest current demand"},
+                {"product": "backlog_ranked_list", "why": "Identify urgent unresolved items"}
+            ]
 
-Select 1-3 most relevant data products. Be strategic - choose products that directly answer the question.
-Keep each "why" to one short phrase (under 10 words).
-Return only the JSON array, nothing else."""
+    def _build_analysis_prompt(
+        self,
+        user_question: str,
+        access_log: List[Dict[str, str]],
+        fetched_data: Dict[str, str],
+    ) -> str:
+        # Format access log (compact: the indentation whitespace is just extra
+        # prompt tokens the model doesn't need)
+        access_log_str = json_dumps(access_log)
+
+        def assemble(data: Dict[str, str]) -> str:
+            # Build via list + join: repeated += on a str re-copies the whole
+            # buffer each iteration, which goes quadratic as retrieval fans out
+            parts = []
+            for product_id, data_summary in data.items():
+                parts.append(f"\n### Data Product: {product_id}\n{data_summary}\n")
+                parts.append(SEP + "\n")
+            data_section = "".join(parts)
+
+            # Instructions and output format live in _SYS_ANALYSIS; contents
+            # carry only the question and the retrieved data
+            return f"""USER QUESTION:
+{user_question}
+
+DATA PRODUCTS ACCESSED:
+{access_log_str}
+
+RETRIEVED DATA:
+{data_section}"""
+
+        prompt = assemble(fetched_data)
+
+        # Size guard: drop the largest summaries rather than shipping a prompt
+        # the API would reject after a wasted upload + tokenize round-trip
+        if _estimate_tokens(prompt) > MAX_PROMPT_TOKENS:
+            fetched_data = dict(fetched_data)
+            while fetched_data and _estimate_tokens(prompt) > MAX_PROMPT_TOKENS:
+                largest = max(fetched_data, key=lambda k: len(fetched_data[k]))
+                if fetched_data[largest].startswith("(data omitted"):
+                    break
+                print(f"Prompt over token budget; omitting data for '{largest}'")
+                fetched_data[largest] = "(data omitted: prompt token budget exceeded)"
+                prompt = assemble(fetched_data)
+
+        return prompt
+
+    def _parse_analysis_response(self, response) -> AnalysisResult:
+        try:
+            return _parsed_json(response)
+
+        except JSONDecodeError as e:
+            print(f"Error parsing JSON response: {e}")
+            print(f"Raw response: {response.text}")
+            # Return the raw text as answer if JSON parsing fails
+            return {
+                "answer": response.text,
+                "rationale": ["Unable to parse structured response"],
+                "key_metrics": []
+            }
+
+    def _build_plan_and_analyze_prompt(
+        self,
+        user_question: str,
+        catalog_summary: str,
+        fetched_data: Dict[str, str],
+    ) -> str:
+        # Build via list + join: repeated += on a str re-copies the whole
+        # buffer each iteration, which goes quadratic as retrieval fans out
+        parts = []
+        for product_id, data_summary in fetched_data.items():
+            parts.append(f"\n### Data Product: {product_id}\n{data_summary}\n")
+            parts.append(SEP + "\n")
+        data_section = "".join(parts)
+
+        # Same static-first ordering as plan_stage: the catalog and the data
+        # summaries form a stable prefix, only the user question varies.
+        # Instructions live in _SYS_PLAN_AND_ANALYZE
+        return f"""AVAILABLE DATA PRODUCTS:
+{catalog_summary}
+
+RETRIEVED DATA (summaries for every product, use only the relevant ones):
+{data_section}
+
+USER QUESTION:
+{user_question}"""
+
+    def _parse_plan_and_analyze_response(self, response) -> PlanAndAnalyzeResult:
+        try:
+            result = _parsed_json(response)
+            if not isinstance(result.get("plan"), list):
+                result["plan"] = []
+            return result
+
+        except JSONDecodeError as e:
+            print(f"Error parsing JSON response: {e}")
+            print(f"Raw response: {response.text}")
+            return {
+                "plan": [],
+                "answer": response.text,
+                "rationale": ["Unable to parse structured response"],
+                "key_metrics": []
+            }
+
+    def _build_keywords_prompt(self, user_message: str, context: str = "") -> str:
+        # Instructions live in _SYS_KEYWORDS
+        return f"""User message: {user_message}
+{f"Context: {context}" if context.strip() else ""}"""
+
+    def _build_cluster_plan_prompt(
+        self,
+        parent_label: str,
+        child_label: str,
+        catalog_summary: str,
+        frequency_preview: str,
+    ) -> str:
+        # Instructions live in _SYS_CLUSTER_PLAN
+        return f"""The user is viewing a cluster: "{parent_label}" (sub-cluster: "{child_label}").
+
+AVAILABLE DATA PRODUCTS (only these have dashboard pages):
+{catalog_summary}
+
+SAMPLE DATA (frequency_over_time preview):
+{frequency_preview}"""
+
+    def _parse_cluster_plan_response(self, response) -> List[PlanItem]:
+        plan = _parsed_json(response)
+        return plan if isinstance(plan, list) else [plan]
+
+    def _build_discuss_prompt(
+        self,
+        parent_label: str,
+        child_label: str,
+        product_display_name: str,
+        data_summary: str,
+    ) -> str:
+        # Instructions live in _SYS_DISCUSS
+        if not data_summary:
+            data_summary = "No summary available."
+        elif len(data_summary) > MAX_SUMMARY:
+            # Slice only when actually oversized; an in-bounds [:2000] still
+            # copies the whole string on every call
+            data_summary = data_summary[:MAX_SUMMARY]
+        return f"""The user just opened the "{product_display_name}" analytics view after viewing the cluster "{parent_label}" (sub-cluster "{child_label}").
+
+Data summary for this view (brief):
+{data_summary}"""
+
+    def _build_report_prompt(
+        self,
+        parent_label: str,
+        child_label: str,
+        discussion: str,
+    ) -> str:
+        # Instructions and metric-format rules live in _SYS_REPORT
+        return f"""Cluster context: "{parent_label}" (sub-cluster: "{child_label}").
+Discussion text (what we showed the user about the analytics view): {discussion}"""
+
+    def _parse_report_response(self, response, discussion: str) -> ReportData:
+        # response_schema enforces answer/rationale/key_metrics types
+        # server-side, so the old per-field isinstance coercions can't fire
+        data = _parsed_json(response)
+        return {
+            "answer": data.get("answer", discussion[:500]),
+            "rationale": data.get("rationale", []),
+            "key_metrics": data.get("key_metrics", []),
+        }
+
+    def _build_simple_chat_prompt(self, user_question: str) -> str:
+        # Instructions live in _SYS_SIMPLE_CHAT
+        return f"""USER QUESTION:
+{user_question}"""
+
+    # ------------------------------------------------------------------
+    # Public API (sync + async variants)
+    # ------------------------------------------------------------------
+
+    def plan_stage(
+        self,
+        user_question: str,
+        catalog_summary: str,
+        frequency_data_preview: str
+    ) -> List[PlanItem]:
+        """
+        Stage 1: Planning prompt to determine which data products to use
+
+        Args:
+            user_question: The user's original question
+            catalog_summary: Summary of available data products
+            frequency_data_preview: Preview of frequency_over_time.csv
+
+        Returns:
+            List of dictionaries with 'product' and 'why' keys
+        """
+        prompt = self._build_plan_prompt(user_question, catalog_summary, frequency_data_preview)
+        _log_prompt_to_console("plan_stage", prompt)
+        try:
+            response = self._generate_content(prompt, config=_get_configs()["plan"])
+        except Exception as e:
+            print(f"Error in plan stage: {e}")
+            raise
+        return self._parse_plan_response(response)
 
+    async def aplan_stage(
+        self,
+        user_question: str,
+        catalog_summary: str,
+        frequency_data_preview: str
+    ) -> List[PlanItem]:
+        """Async variant of plan_stage"""
+        prompt = self._build_plan_prompt(user_question, catalog_summary, frequency_data_preview)
         _log_prompt_to_console("plan_stage", prompt)
         try:
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash", contents=prompt
-            )
-            response_text = response.text.strip()
-            
-            # Remove markdown code blocks if present
-            if response_text.startswith("```"):
-                # Extract content between code blocks
-                lines = response_text.split("\n")
-                response_text = "\n".join(lines[1:-1]) if len(lines) > 2 else response_text
-                if response_text.startswith("json"):
-                    response_text = response_text[4:].strip()
-            
-            # Parse JSON response
-            plan = json.loads(response_text)
-            return plan
-        
-        except json.JSONDecodeError as e:
-            print(f"Error parsing JSON response: {e}")
-            print(f"Raw response: {response.text}")
-            # Return a default fallback
-            return [
-                {"product": "top10_volume_30d", "why": "Identify highest current demand"},
-                {"product": "backlog_ranked_list", "why": "Identify urgent unresolved items"}
-            ]
+            response = await self._agenerate_content(prompt, config=_get_configs()["plan"])
         except Exception as e:
             print(f"Error in plan stage: {e}")
             raise
-    
+        return self._parse_plan_response(response)
+
     def analysis_stage(
         self,
         user_question: str,
         access_log: List[Dict[str, str]],
         fetched_data: Dict[str, str]
-    ) -> Dict[str, Any]:
+    ) -> AnalysisResult:
         """
         Stage 2: Analysis prompt to provide final answer with data
-        
+
         Args:
             user_question: The user's original question
             access_log: The plan from stage 1 (list of products accessed)
             fetched_data: Dictionary mapping product_id to data summary string
-            
+
         Returns:
             Dictionary with 'answer' and 'rationale' keys
         """
-        
-        # Format the fetched data section
-        data_section = ""
-        for product_id, data_summary in fetched_data.items():
-            data_section += f"\n### Data Product: {product_id}\n"
-            data_section += f"{data_summary}\n"
-            data_section += "-" * 80 + "\n"
-        
-        # Format access log
-        access_log_str = json.dumps(access_log, indent=2)
-        
-        prompt = f"""You are a data analyst providing insights on CRM service request data.
+        prompt = self._build_analysis_prompt(user_question, access_log, fetched_data)
+        _log_prompt_to_console("analysis_stage", prompt)
+        try:
+            response = self._generate_content(prompt, config=_get_configs()["analysis"])
+        except Exception as e:
+            print(f"Error in analysis stage: {e}")
+            raise
+        return self._parse_analysis_response(response)
 
-USER QUESTION:
-{user_question}
+    async def aanalysis_stage(
+        self,
+        user_question: str,
+        access_log: List[Dict[str, str]],
+        fetched_data: Dict[str, str]
+    ) -> AnalysisResult:
+        """Async variant of analysis_stage"""
+        prompt = self._build_analysis_prompt(user_question, access_log, fetched_data)
+        _log_prompt_to_console("analysis_stage", prompt)
+        try:
+            response = await self._agenerate_content(prompt, config=_get_configs()["analysis"])
+        except Exception as e:
+            print(f"Error in analysis stage: {e}")
+            raise
+        return self._parse_analysis_response(response)
 
-DATA PRODUCTS ACCESSED:
-{access_log_str}
+    async def aplan_stages_bulk(
+        self,
+        user_questions: List[str],
+        catalog_summary: str,
+        frequency_data_preview: str,
+        max_concurrency: int = 8,
+    ) -> List[List[PlanItem]]:
+        """
+        Run plan_stage for many questions concurrently with asyncio.gather
 
-RETRIEVED DATA:
-{data_section}
+        A semaphore caps in-flight calls at max_concurrency so network RTT and
+        Gemini prefill overlap across questions without blowing past the
+        requests-per-minute budget (the shared token bucket still paces each
+        call, and 429 backoff lives in _agenerate_content).
 
-Based on the data provided above, answer the user's question as briefly as possible.
+        Args:
+            user_questions: List of user questions to plan for
+            catalog_summary: Summary of available data products (shared)
+            frequency_data_preview: Preview of frequency_over_time.csv (shared)
+            max_concurrency: Maximum number of in-flight Gemini calls
 
-Format your response as a JSON object with these keys:
-- "answer": One or two short sentences max. Be as short as possible.
-- "rationale": 1-3 brief bullet points with key numbers only.
-- "key_metrics": Short list of numbers referenced (e.g., ["663", "18.5%"]).
+        Returns:
+            List of plans, in the same order as user_questions
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
 
-IMPORTANT: Keep every part minimal. Return ONLY valid JSON with no additional text, markdown, or code blocks.
+        async def _run_one(question: str):
+            async with semaphore:
+                return await self.aplan_stage(question, catalog_summary, frequency_data_preview)
 
-Example format:
-{{
-  "answer": "Recreation leads with 663 requests (18.5%). Roads/traffic second at 562 (15.7%).",
-  "rationale": ["Recreation 663 (18.5%)", "Roads 562 (15.7%)"],
-  "key_metrics": ["663", "18.5%", "562", "15.7%"]
-}}
+        return list(await asyncio.gather(*(_run_one(q) for q in user_questions)))
+
+    def plan_stages_bulk(
+        self,
+        user_questions: List[str],
+        catalog_summary: str,
+        frequency_data_preview: str,
+        max_concurrency: int = 8,
+    ) -> List[List[PlanItem]]:
+        """Sync wrapper around aplan_stages_bulk for non-async callers"""
+        return asyncio.run(
+            self.aplan_stages_bulk(
+                user_questions, catalog_summary, frequency_data_preview, max_concurrency
+            )
+        )
 
-Now analyze the data and respond (keep it short):"""
+    def plan_and_analyze(
+        self,
+        user_question: str,
+        catalog_summary: str,
+        fetched_data: Dict[str, str]
+    ) -> PlanAndAnalyzeResult:
+        """
+        Fused stage 1 + stage 2 in a single Gemini round-trip
 
-        _log_prompt_to_console("analysis_stage", prompt)
+        The caller prefetches summaries for every product (they are small,
+        pre-generated text files) and Gemini both picks the relevant ones and
+        answers from them in one call, so a question pays one gateway/prefill
+        round-trip instead of two sequential ones.
+
+        Args:
+            user_question: The user's original question
+            catalog_summary: Summary of available data products
+            fetched_data: Dictionary mapping product_id to data summary string
+                (should cover the whole catalog)
+
+        Returns:
+            Dictionary with 'plan', 'answer', 'rationale' and 'key_metrics' keys
+        """
+        prompt = self._build_plan_and_analyze_prompt(user_question, catalog_summary, fetched_data)
+        _log_prompt_to_console("plan_and_analyze", prompt)
         try:
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash", contents=prompt)
-            response_text = response.text.strip()
-            
-            # Remove markdown code blocks if present
-            if response_text.startswith("```"):
-                lines = response_text.split("\n")
-                response_text = "\n".join(lines[1:-1]) if len(lines) > 2 else response_text
-                if response_text.startswith("json"):
-                    response_text = response_text[4:].strip()
-            
-            # Parse JSON response
-            result = json.loads(response_text)
-            return result
-        
-        except json.JSONDecodeError as e:
-            print(f"Error parsing JSON response: {e}")
-            print(f"Raw response: {response.text}")
-            # Return the raw text as answer if JSON parsing fails
-            return {
-                "answer": response.text,
-                "rationale": ["Unable to parse structured response"],
-                "key_metrics": []
-            }
+            response = self._generate_content(prompt, config=_get_configs()["plan_and_analyze"])
         except Exception as e:
-            print(f"Error in analysis stage: {e}")
+            print(f"Error in plan_and_analyze: {e}")
+            raise
+        return self._parse_plan_and_analyze_response(response)
+
+    async def aplan_and_analyze(
+        self,
+        user_question: str,
+        catalog_summary: str,
+        fetched_data: Dict[str, str]
+    ) -> PlanAndAnalyzeResult:
+        """Async variant of plan_and_analyze"""
+        prompt = self._build_plan_and_analyze_prompt(user_question, catalog_summary, fetched_data)
+        _log_prompt_to_console("plan_and_analyze", prompt)
+        try:
+            response = await self._agenerate_content(prompt, config=_get_configs()["plan_and_analyze"])
+        except Exception as e:
+            print(f"Error in plan_and_analyze: {e}")
             raise
-    
+        return self._parse_plan_and_analyze_response(response)
+
     def extract_search_keywords(self, user_message: str, context: str = "") -> str:
         """
         Extract search keywords from the user message for cluster embedding search.
         Use before predict_cluster so the embedding query aligns with cluster labels.
-        
+
         Args:
             user_message: The user's raw message (e.g. "Im interested in people booking city hall")
             context: Optional context (e.g. "matching against Facility Booking, City Hall Room Booking")
-            
+
         Returns:
             Short phrase (5–15 words) optimized for semantic search against cluster labels
         """
-        prompt = f"""You are helping prepare a search query for matching a user message against municipal service request cluster labels (e.g. "Facility Booking", "City Hall Room Booking", "Parks", "Roads").
+        cache_key = self._keywords_cache_key(user_message, context)
+        cached = self._keywords_text_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-User message: {user_message}
-{f"Context: {context}" if context.strip() else ""}
+        prompt = self._build_keywords_prompt(user_message, context)
+        _log_prompt_to_console("extract_search_keywords", prompt)
+        try:
+            response = self._generate_content(prompt, model=self.model_lite, config=_get_configs()["keywords"], cache=True)
+            text = response.text.strip().strip('"\'')
+            text = text if text else user_message[:200]
+            self._keywords_text_cache.put(cache_key, text)
+            return text
+        except Exception as e:
+            print(f"Error in extract_search_keywords: {e}")
+            return user_message[:200]
 
-Output a single short phrase (5–15 words) that captures the key concepts for semantic search. Use terms that would match cluster labels: facility, booking, city hall, room, parks, roads, complaints, reservations, etc. No quotes or explanation—only the search phrase."""
+    async def aextract_search_keywords(self, user_message: str, context: str = "") -> str:
+        """Async variant of extract_search_keywords"""
+        cache_key = self._keywords_cache_key(user_message, context)
+        cached = self._keywords_text_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
+        prompt = self._build_keywords_prompt(user_message, context)
         _log_prompt_to_console("extract_search_keywords", prompt)
         try:
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=prompt,
-            )
+            response = await self._agenerate_content(prompt, model=self.model_lite, config=_get_configs()["keywords"], cache=True)
             text = response.text.strip().strip('"\'')
-            return text if text else user_message[:200]
+            text = text if text else user_message[:200]
+            self._keywords_text_cache.put(cache_key, text)
+            return text
         except Exception as e:
             print(f"Error in extract_search_keywords: {e}")
             return user_message[:200]
@@ -248,40 +1068,37 @@ Output a single short phrase (5–15 words) that captures the key concepts for s
         child_label: str,
         catalog_summary: str,
         frequency_preview: str,
-    ) -> List[Dict[str, str]]:
+    ) -> List[PlanItem]:
         """
         Plan which single data product (that has an analytics page) is most relevant
         for a cluster the user is viewing. Returns a list with one item for compatibility with plan_stage.
         """
-        prompt = f"""You are a data analyst. The user is viewing a cluster: "{parent_label}" (sub-cluster: "{child_label}").
-
-Choose the SINGLE most relevant data product to show on an analytics dashboard for this cluster.
-
-AVAILABLE DATA PRODUCTS (only these have dashboard pages):
-{catalog_summary}
-
-SAMPLE DATA (frequency_over_time preview):
-{frequency_preview}
-
-IMPORTANT: Return ONLY a valid JSON array with exactly ONE object. No other text.
-Output format: [{{ "product": "product_id_from_catalog", "why": "Brief reason" }}]
-
-Pick ONE product that best fits this cluster. Valid product IDs include: frequency_over_time, backlog_ranked_list, backlog_distribution, priority_quadrant, geographic_hot_spots, time_to_close.
-Return only the JSON array."""
+        prompt = self._build_cluster_plan_prompt(
+            parent_label, child_label, catalog_summary, frequency_preview
+        )
+        _log_prompt_to_console("plan_one_analytics_product_for_cluster", prompt)
+        try:
+            response = self._generate_content(prompt, model=self.model_lite, config=_get_configs()["cluster_plan"], cache=True)
+            return self._parse_cluster_plan_response(response)
+        except Exception as e:
+            print(f"Error in plan_one_analytics_product_for_cluster: {e}")
+            return [{"product": "frequency_over_time", "why": "Default trend view"}]
 
+    async def aplan_one_analytics_product_for_cluster(
+        self,
+        parent_label: str,
+        child_label: str,
+        catalog_summary: str,
+        frequency_preview: str,
+    ) -> List[PlanItem]:
+        """Async variant of plan_one_analytics_product_for_cluster"""
+        prompt = self._build_cluster_plan_prompt(
+            parent_label, child_label, catalog_summary, frequency_preview
+        )
         _log_prompt_to_console("plan_one_analytics_product_for_cluster", prompt)
         try:
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash", contents=prompt
-            )
-            text = response.text.strip()
-            if text.startswith("```"):
-                lines = text.split("\n")
-                text = "\n".join(lines[1:-1]) if len(lines) > 2 else text
-                if text.startswith("json"):
-                    text = text[4:].strip()
-            plan = json.loads(text)
-            return plan if isinstance(plan, list) else [plan]
+            response = await self._agenerate_content(prompt, model=self.model_lite, config=_get_configs()["cluster_plan"], cache=True)
+            return self._parse_cluster_plan_response(response)
         except Exception as e:
             print(f"Error in plan_one_analytics_product_for_cluster: {e}")
             return [{"product": "frequency_over_time", "why": "Default trend view"}]
@@ -298,22 +1115,32 @@ Return only the JSON array."""
         Generate 1-3 sentences discussing how this analytics view relates to the cluster
         or general trends when the relationship is weak.
         """
-        prompt = f"""You are an assistant to the Mayor. The user just opened the "{product_display_name}" analytics view after viewing the cluster "{parent_label}" (sub-cluster "{child_label}").
-
-Data summary for this view (brief):
-{data_summary[:2000] if data_summary else "No summary available."}
-
-Write 1-3 short sentences that either:
-- Explain how this analytics view relates to that cluster (if there is a clear link), or
-- Discuss general trends from the data (if the link is weak).
-
-Be concise and natural. No bullet points. Output only the paragraph."""
+        prompt = self._build_discuss_prompt(
+            parent_label, child_label, product_display_name, data_summary
+        )
+        _log_prompt_to_console("discuss_analytics_visit", prompt)
+        try:
+            response = self._generate_content(prompt, config=_get_configs()["discuss"])
+            return response.text.strip()
+        except Exception as e:
+            print(f"Error in discuss_analytics_visit: {e}")
+            return f"This {product_display_name} view shows trends that can complement the \"{parent_label}\" cluster you were viewing."
 
+    async def adiscuss_analytics_visit(
+        self,
+        parent_label: str,
+        child_label: str,
+        product_id: str,
+        product_display_name: str,
+        data_summary: str,
+    ) -> str:
+        """Async variant of discuss_analytics_visit"""
+        prompt = self._build_discuss_prompt(
+            parent_label, child_label, product_display_name, data_summary
+        )
         _log_prompt_to_console("discuss_analytics_visit", prompt)
         try:
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash", contents=prompt
-            )
+            response = await self._agenerate_content(prompt, config=_get_configs()["discuss"])
             return response.text.strip()
         except Exception as e:
             print(f"Error in discuss_analytics_visit: {e}")
@@ -324,53 +1151,37 @@ Be concise and natural. No bullet points. Output only the paragraph."""
         parent_label: str,
         child_label: str,
         discussion: str,
-    ) -> Dict[str, Any]:
+    ) -> ReportData:
         """
         Convert discussion + cluster context into report JSON: answer, rationale, key_metrics.
         Used to feed ReportGenerator.generate_pdf(). key_metrics must include category names
         so the report can render Metrics Analysis charts (MetricParser extracts category from text).
         """
-        prompt = f"""You are preparing structured data for a CRM analytics PDF report that includes metrics analysis and graphs.
-
-Cluster context: "{parent_label}" (sub-cluster: "{child_label}").
-Discussion text (what we showed the user about the analytics view): {discussion}
-
-Output a JSON object with exactly these keys:
-
-- "answer": One or two sentences summarizing the main finding (use the discussion as the basis).
-- "rationale": Array of 2-5 short bullet-point strings with specific insights and numbers (e.g. "Recreation leads with 663 requests (18.5%)", "Roads second with 562 requests (15.68%)").
-- "key_metrics": Array of metric strings that MUST include the category name so charts can be generated. Use these exact patterns:
-  * For volume: "X requests in CategoryName" or "X recent requests in CategoryName" (e.g. "663 recent requests in Recreation and leisure")
-  * For growth: "X% growth in CategoryName" (e.g. "73.1% growth in Recreation and leisure")
-  * For increase: "X requests increase in CategoryName" (e.g. "280 requests increase in Recreation and leisure")
-  * For percentage of total: "X% in CategoryName" (e.g. "18.5% in Recreation and leisure")
-  Include 5-12 key_metrics covering the main categories and numbers from the discussion. Each metric string must contain both a number and a category name (e.g. "Recreation and leisure", "Roads, traffic and sidewalks", "Trees").
-
-Example key_metrics format:
-["663 recent requests in Recreation and leisure", "18.5% in Recreation and leisure", "73.1% growth in Recreation and leisure", "562 recent requests in Roads, traffic and sidewalks", "15.68% in Roads, traffic and sidewalks", "280 requests increase in Recreation and leisure"]
-
-Return ONLY valid JSON, no markdown or code fences."""
+        prompt = self._build_report_prompt(parent_label, child_label, discussion)
+        _log_prompt_to_console("report_data_from_discussion", prompt)
+        try:
+            response = self._generate_content(prompt, config=_get_configs()["report"])
+            return self._parse_report_response(response, discussion)
+        except Exception as e:
+            print(f"Error in report_data_from_discussion: {e}")
+            return {
+                "answer": discussion[:500] if discussion else "Analysis complete.",
+                "rationale": [s.strip() for s in discussion.split(".") if s.strip()][:4],
+                "key_metrics": [],
+            }
 
+    async def areport_data_from_discussion(
+        self,
+        parent_label: str,
+        child_label: str,
+        discussion: str,
+    ) -> ReportData:
+        """Async variant of report_data_from_discussion"""
+        prompt = self._build_report_prompt(parent_label, child_label, discussion)
         _log_prompt_to_console("report_data_from_discussion", prompt)
         try:
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash", contents=prompt
-            )
-            text = response.text.strip()
-            if text.startswith("```"):
-                lines = text.split("\n")
-                text = "\n".join(lines[1:-1]) if len(lines) > 2 else text
-                if text.startswith("json"):
-                    text = text[4:].strip()
-            data = json.loads(text)
-            answer = data.get("answer", discussion[:500])
-            rationale = data.get("rationale", [])
-            if not isinstance(rationale, list):
-                rationale = [str(rationale)]
-            key_metrics = data.get("key_metrics", [])
-            if not isinstance(key_metrics, list):
-                key_metrics = [str(key_metrics)]
-            return {"answer": answer, "rationale": rationale, "key_metrics": key_metrics}
+            response = await self._agenerate_content(prompt, config=_get_configs()["report"])
+            return self._parse_report_response(response, discussion)
         except Exception as e:
             print(f"Error in report_data_from_discussion: {e}")
             return {
@@ -379,42 +1190,195 @@ Return ONLY valid JSON, no markdown or code fences."""
                 "key_metrics": [],
             }
 
+    def report_data_from_discussion_batch(
+        self,
+        items: List[Dict[str, str]],
+        poll_interval: float = 10.0,
+        timeout: float = 1800.0,
+    ) -> List[ReportData]:
+        """
+        Bulk version of report_data_from_discussion using the Gemini Batch API
+
+        Batch jobs are billed at roughly half the synchronous rate, so
+        producing PDFs for many clusters (or regenerating historical reports)
+        should go through here instead of looping over the online endpoint.
+        Small sets aren't worth a batch job's queueing delay and fall back to
+        per-item online calls.
+
+        Args:
+            items: List of dicts with 'parent_label', 'child_label' and
+                'discussion' keys
+            poll_interval: Seconds between batch job status polls
+            timeout: Give up (and fall back to online calls) after this long
+
+        Returns:
+            List of report dicts (answer/rationale/key_metrics), in the same
+            order as items
+        """
+        if len(items) < 8:
+            return [
+                self.report_data_from_discussion(
+                    item["parent_label"], item["child_label"], item["discussion"]
+                )
+                for item in items
+            ]
+
+        def _online_fallback():
+            return [
+                self.report_data_from_discussion(
+                    item["parent_label"], item["child_label"], item["discussion"]
+                )
+                for item in items
+            ]
+
+        try:
+            inline_requests = [
+                {
+                    "contents": self._build_report_prompt(
+                        item["parent_label"], item["child_label"], item["discussion"]
+                    ),
+                    "config": _get_configs()["report"],
+                }
+                for item in items
+            ]
+            job = self.client.batches.create(
+                model=self.model_flash,
+                src=inline_requests,
+                config={"display_name": "report-data-from-discussion"},
+            )
+
+            deadline = time.monotonic() + timeout
+            done_states = ("JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED")
+            while job.state.name not in done_states:
+                if time.monotonic() > deadline:
+                    print("Batch report job timed out; falling back to online calls")
+                    return _online_fallback()
+                time.sleep(poll_interval)
+                job = self.client.batches.get(name=job.name)
+
+            if job.state.name != "JOB_STATE_SUCCEEDED":
+                print(f"Batch report job ended in {job.state.name}; falling back to online calls")
+                return _online_fallback()
+
+            results = []
+            for item, inlined in zip(items, job.dest.inlined_responses):
+                try:
+                    results.append(self._parse_report_response(inlined.response, item["discussion"]))
+                except Exception as e:
+                    print(f"Error parsing batch report response: {e}")
+                    discussion = item["discussion"]
+                    results.append({
+                        "answer": discussion[:500] if discussion else "Analysis complete.",
+                        "rationale": [s.strip() for s in discussion.split(".") if s.strip()][:4],
+                        "key_metrics": [],
+                    })
+            return results
+
+        except Exception as e:
+            print(f"Error in report_data_from_discussion_batch: {e}")
+            return _online_fallback()
+
     def simple_chat(self, user_question: str) -> str:
         """
         Simple chatbot mode - direct conversation with Gemini
         No data retrieval, just conversational responses with context
-        
+
         Args:
             user_question: The user's question
-            
+
         Returns:
             String response from Gemini
         """
-        
-        prompt = f"""You are an intelligent assistant to the Mayor, specializing in municipal service requests and CRM data.
-
-You have knowledge about:
-- Municipal service request categories (roads, traffic, sidewalks, recreation, parks, etc.)
-- Service request lifecycle and management
-- Common municipal operations and priorities
-- How cities handle citizen requests and complaints
-
-The user is asking you a question. Reply in 1-3 short sentences only. Be as brief as possible while still helpful. No long explanations.
+        prompt = self._build_simple_chat_prompt(user_question)
+        _log_prompt_to_console("simple_chat", prompt)
+        try:
+            response = self._generate_content(prompt, model=self.model_lite, config=_get_configs()["simple_chat"])
+            return response.text.strip()
+        except Exception as e:
+            print(f"Error in simple chat: {e}")
+            raise
 
-If the user asks about specific data or analytics, say they can use "analysis" for deep data analysis.
+    async def asimple_chat(self, user_question: str) -> str:
+        """Async variant of simple_chat"""
+        prompt = self._build_simple_chat_prompt(user_question)
+        _log_prompt_to_console("simple_chat", prompt)
+        try:
+            response = await self._agenerate_content(prompt, model=self.model_lite, config=_get_configs()["simple_chat"])
+            return response.text.strip()
+        except Exception as e:
+            print(f"Error in simple chat: {e}")
+            raise
 
-USER QUESTION:
-{user_question}
 
-Your response:"""
+    def simple_chat_stream(self, user_question: str):
+        """
+        Streaming variant of simple_chat: yields response text chunks as they
+        arrive so the HTTP layer can flush tokens to the client immediately
+        instead of waiting for the full generation (TTFB drops to first-token)
+        """
+        prompt = self._build_simple_chat_prompt(user_question)
+        _log_prompt_to_console("simple_chat", prompt)
+        try:
+            for chunk in self._generate_content_stream(prompt, model=self.model_lite, config=_get_configs()["simple_chat"]):
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            print(f"Error in simple chat: {e}")
+            raise
 
+    async def asimple_chat_stream(self, user_question: str):
+        """Async variant of simple_chat_stream"""
+        prompt = self._build_simple_chat_prompt(user_question)
         _log_prompt_to_console("simple_chat", prompt)
         try:
-            response = self.client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=prompt
-            )
-            return response.text.strip()
+            async for chunk in self._agenerate_content_stream(prompt, model=self.model_lite, config=_get_configs()["simple_chat"]):
+                if chunk.text:
+                    yield chunk.text
         except Exception as e:
             print(f"Error in simple chat: {e}")
             raise
+
+    def discuss_analytics_visit_stream(
+        self,
+        parent_label: str,
+        child_label: str,
+        product_id: str,
+        product_display_name: str,
+        data_summary: str,
+    ):
+        """
+        Streaming variant of discuss_analytics_visit: yields text chunks as
+        they arrive; yields the same fallback sentence on errors
+        """
+        prompt = self._build_discuss_prompt(
+            parent_label, child_label, product_display_name, data_summary
+        )
+        _log_prompt_to_console("discuss_analytics_visit", prompt)
+        try:
+            for chunk in self._generate_content_stream(prompt, config=_get_configs()["discuss"]):
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            print(f"Error in discuss_analytics_visit: {e}")
+            yield f"This {product_display_name} view shows trends that can complement the \"{parent_label}\" cluster you were viewing."
+
+    async def adiscuss_analytics_visit_stream(
+        self,
+        parent_label: str,
+        child_label: str,
+        product_id: str,
+        product_display_name: str,
+        data_summary: str,
+    ):
+        """Async variant of discuss_analytics_visit_stream"""
+        prompt = self._build_discuss_prompt(
+            parent_label, child_label, product_display_name, data_summary
+        )
+        _log_prompt_to_console("discuss_analytics_visit", prompt)
+        try:
+            async for chunk in self._agenerate_content_stream(prompt, config=_get_configs()["discuss"]):
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            print(f"Error in discuss_analytics_visit: {e}")
+            yield f"This {product_display_name} view shows trends that can complement the \"{parent_label}\" cluster you were viewing."
@@ -3,7 +3,11 @@ Generate and save data summaries for all catalog products
 Summaries are saved as .txt files for faster loading by Gemini
 """
 
+import json
+import os
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 
@@ -14,14 +18,137 @@ sys.path.insert(0, str(backend_path))
 from agent.catalog import DATA_CATALOG
 from agent.data_loader import DataLoader
 
+# Everything in the header except the timestamp is derived from the catalog,
+# which is constant for the process, so the static block is formatted exactly
+# once per product at import; per call only the two dynamic lines remain
+_HEADER_STATIC = {
+    product_id: (
+        f"# Description: {details['description']}\n"
+        f"# Source File: {details['file']}\n"
+        f"# Filter: {details['filter'] or 'None'}\n"
+        f"# Use Cases: {', '.join(details['use_cases'])}\n"
+        f"# Metrics: {', '.join(details['metrics'])}\n"
+        + "=" * 80 + "\n\n"
+    )
+    for product_id, details in DATA_CATALOG.items()
+}
 
-def generate_all_summaries(output_dir: str = None, max_rows: int = 50):
+
+
+
+def _summaries_dir() -> Path:
+    """
+    Summaries directory computed straight from __file__, so filesystem-only
+    commands (list/view) don't need to construct a DataLoader
+    """
+    return Path(__file__).parent.parent / "trends" / "data" / "summaries"
+
+
+
+def _update_index(summary_dir: Path, updates: dict):
+    """
+    Rebuild summaries/index.json from the directory contents under a file lock
+
+    The index lets list_summaries answer with one read instead of a
+    directory walk plus a stat per file. It is reconciled against a scan on
+    every write, so a single-product regenerate still indexes summaries that
+    were already on disk and deleted files don't linger in the listing.
+
+    Args:
+        updates: Mapping of product_id to {"bytes": int, "mtime": float} for
+            files written by the caller (overrides the scanned entry)
+    """
+    index_path = summary_dir / "index.json"
+    with open(summary_dir / ".index.lock", "w") as lock:
+        try:
+            import fcntl
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        except ImportError:
+            pass  # no flock on this platform; writes are atomic regardless
+
+        index = {}
+        with os.scandir(summary_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".txt") and not entry.name.startswith("."):
+                    st = entry.stat()
+                    index[entry.name[:-4]] = {"bytes": st.st_size, "mtime": st.st_mtime}
+        index.update(updates)
+
+        # Same atomic write pattern as the summaries themselves
+        fd, tmp = tempfile.mkstemp(dir=summary_dir, prefix=".index.", suffix=".json")
+        try:
+            os.write(fd, json.dumps(index, indent=2, sort_keys=True).encode("utf-8"))
+        finally:
+            os.close(fd)
+        os.replace(tmp, index_path)
+
+
+def _index_entry(path) -> dict:
+    """Index entry ({"bytes", "mtime"}) for a written summary file"""
+    st = os.stat(path)
+    return {"bytes": st.st_size, "mtime": st.st_mtime}
+
+
+def _build_one(product_id: str, output_dir: str, max_rows: int, ts: str = None,
+               loader: DataLoader = None):
+    """
+    Build and save the summary file for a single product
+
+    Safe to run from a pool of worker threads: the CSV parse releases the
+    GIL inside pandas/pyarrow and the write is plain file I/O.
+
+    Returns:
+        Tuple of (product_id, success flag, log message)
+    """
+    if loader is None:
+        loader = DataLoader()
+    output_dir = Path(output_dir)
+    if ts is None:
+        ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    try:
+        # Load the data product
+        df = loader.load_product(product_id)
+
+        if df is None:
+            return product_id, False, "  ⚠️  Could not load data"
+
+        # Generate summary (use last rows for time series like frequency_over_time)
+        from_end = product_id in ['frequency_over_time', 'seasonality_heatmap']
+        summary = loader.get_data_summary(df, max_rows=max_rows, from_end=from_end)
+
+        # Add metadata header (static block precomputed at import)
+        header = f"# Data Summary: {product_id}\n# Generated: {ts}\n" + _HEADER_STATIC[product_id]
+
+        # Save to file: write to a tempfile in the same directory, then
+        # os.replace so readers (and the mtime freshness check) never see a
+        # half-written summary if this crashes mid-write
+        output_file = output_dir / f"{product_id}.txt"
+        fd, tmp = tempfile.mkstemp(dir=output_dir, prefix=f".{product_id}.", suffix=".txt")
+        try:
+            os.write(fd, header.encode('utf-8'))
+            os.write(fd, summary.encode('utf-8'))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp, output_file)
+
+        total_chars = len(header) + len(summary)
+        return (product_id, True,
+                f"  ✅ Saved to {output_file.name} ({total_chars} chars, {df.shape[0]} rows)")
+
+    except Exception as e:
+        return product_id, False, f"  ❌ Error: {e}"
+
+
+def generate_all_summaries(output_dir: str = None, max_rows: int = 50, force: bool = False):
     """
     Generate text summaries for all data products and save them
     
     Args:
         output_dir: Directory to save summaries (default: backend/trends/data/summaries)
         max_rows: Maximum rows to include in each summary
+        force: Regenerate even if the summary is newer than its source CSV
     """
     loader = DataLoader()
     
@@ -43,52 +170,72 @@ def generate_all_summaries(output_dir: str = None, max_rows: int = 50):
     
     successful = 0
     failed = 0
-    
+    skipped = 0
+
+    # Skip products whose summary is already newer than the source file;
+    # after a one-CSV edit only that product gets rebuilt
+    to_build = []
     for product_id, details in DATA_CATALOG.items():
-        print(f"Processing: {product_id}...")
-        
-        try:
-            # Load the data product
-            df = loader.load_product(product_id)
-            
-            if df is None:
-                print(f"  ⚠️  Could not load data")
-                failed += 1
+        if not force:
+            # One stat per path: fetch mtimes directly and treat a missing
+            # file as stale instead of paying a separate exists() stat
+            try:
+                out_mtime = os.stat(output_dir / f"{product_id}.txt").st_mtime_ns
+                src_mtime = os.stat(loader.data_dir / details["file"]).st_mtime_ns
+            except OSError:
+                out_mtime, src_mtime = 0, 1
+            if out_mtime >= src_mtime:
+                sys.stdout.write(
+                    f"Processing: {product_id}...\n"
+                    f"  ⏭️  Up to date (summary newer than {details['file']})\n"
+                )
+                skipped += 1
                 continue
-            
-            # Generate summary (use last rows for time series like frequency_over_time)
-            from_end = product_id in ['frequency_over_time', 'seasonality_heatmap']
-            summary = loader.get_data_summary(df, max_rows=max_rows, from_end=from_end)
-            
-            # Add metadata header
-            header = f"""# Data Summary: {product_id}
-# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-# Description: {details['description']}
-# Source File: {details['file']}
-# Filter: {details['filter'] or 'None'}
-# Use Cases: {', '.join(details['use_cases'])}
-# Metrics: {', '.join(details['metrics'])}
-{'='*80}
+        to_build.append(product_id)
 
-"""
-            
-            full_summary = header + summary
-            
-            # Save to file
-            output_file = output_dir / f"{product_id}.txt"
-            output_file.write_text(full_summary, encoding='utf-8')
-            
-            print(f"  ✅ Saved to {output_file.name} ({len(full_summary)} chars, {df.shape[0]} rows)")
-            successful += 1
-            
-        except Exception as e:
-            print(f"  ❌ Error: {e}")
-            failed += 1
+    # The heavy part of each product - the CSV parse - runs in C with the
+    # GIL released, so a thread pool overlaps the work without the fork and
+    # pickle overhead of worker processes (and shares one DataLoader/cache)
+    ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    if to_build:
+        with ThreadPoolExecutor(max_workers=min(8, len(to_build))) as executor:
+            futures = {
+                executor.submit(_build_one, product_id, str(output_dir), max_rows, ts, loader): product_id
+                for product_id in to_build
+            }
+            built_ok = []
+            for future in as_completed(futures):
+                product_id, ok, message = future.result()
+                # One write per product keeps its lines contiguous (results
+                # arrive from worker threads) and halves the stdio flushes
+                sys.stdout.write(f"Processing: {product_id}...\n{message}\n")
+                if ok:
+                    successful += 1
+                    built_ok.append(product_id)
+                else:
+                    failed += 1
+
+        # Refresh the listing index for everything written this run
+        try:
+            _update_index(output_dir, {
+                pid: _index_entry(output_dir / f"{pid}.txt") for pid in built_ok
+            })
+        except OSError as e:
+            print(f"⚠️  Could not update index.json: {e}")
     
+    # Also emit the planning-stage preview so query() never has to parse CSV
+    try:
+        generate_frequency_preview(loader, output_dir)
+        print(f"  ✅ Saved frequency_over_time_preview.txt")
+    except Exception as e:
+        print(f"  ❌ Error generating frequency preview: {e}")
+
     print("\n" + "="*80)
     print("Summary Generation Complete")
     print("="*80)
     print(f"✅ Successful: {successful}/{len(DATA_CATALOG)}")
+    if skipped > 0:
+        print(f"⏭️  Skipped (up to date): {skipped}/{len(DATA_CATALOG)}")
     if failed > 0:
         print(f"❌ Failed: {failed}/{len(DATA_CATALOG)}")
     print(f"\nSummaries saved to: {output_dir}")
@@ -96,6 +243,32 @@ def generate_all_summaries(output_dir: str = None, max_rows: int = 50):
     return successful, failed
 
 
+def generate_frequency_preview(loader: DataLoader = None, output_dir: Path = None, num_rows: int = 10):
+    """
+    Generate the small frequency_over_time preview used by the planning stage
+    so _get_frequency_preview can read a text file instead of parsing CSV
+
+    Args:
+        loader: DataLoader to use (created if not provided)
+        output_dir: Directory to save the preview (default: summaries dir)
+        num_rows: Number of rows to include in the preview
+    """
+    if loader is None:
+        loader = DataLoader()
+    if output_dir is None:
+        output_dir = loader.data_dir / "summaries"
+    output_dir.mkdir(exist_ok=True)
+
+    df = loader.load_product("frequency_over_time")
+    if df is None:
+        raise RuntimeError("Could not load frequency_over_time")
+
+    preview = loader.get_data_summary(df, max_rows=num_rows)
+    output_file = output_dir / "frequency_over_time_preview.txt"
+    output_file.write_text(preview, encoding='utf-8')
+    return output_file
+
+
 def view_summary(product_id: str):
     """
     Display a saved summary for a product
@@ -103,11 +276,10 @@ def view_summary(product_id: str):
     Args:
         product_id: The product identifier
     """
-    loader = DataLoader()
-    summary_dir = loader.data_dir / "summaries"
-    summary_file = summary_dir / f"{product_id}.txt"
+    summary_file = _summaries_dir() / f"{product_id}.txt"
     
-    if not summary_file.exists():
+    # lexists is a single stat with no symlink follow
+    if not os.path.lexists(summary_file):
         print(f"❌ Summary not found: {summary_file}")
         print(f"Run generate_all_summaries() first")
         return
@@ -120,30 +292,46 @@ def view_summary(product_id: str):
 
 def list_summaries():
     """List all available summaries"""
-    loader = DataLoader()
-    summary_dir = loader.data_dir / "summaries"
+    summary_dir = _summaries_dir()
     
     if not summary_dir.exists():
         print("❌ No summaries directory found")
         print("Run generate_all_summaries() first")
         return
     
-    summaries = list(summary_dir.glob("*.txt"))
-    
+    # Prefer the index maintained by the generators: one open/parse instead
+    # of a directory walk plus a stat per file
+    rows = None
+    try:
+        index = json.loads((summary_dir / "index.json").read_text(encoding="utf-8"))
+        rows = sorted((pid, entry["bytes"]) for pid, entry in index.items())
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    if rows is None:
+        # No (or unreadable) index: fall back to a single scandir pass
+        with os.scandir(summary_dir) as it:
+            rows = sorted(
+                (e.name[:-4], e.stat().st_size)
+                for e in it
+                if e.name.endswith('.txt') and not e.name.startswith('.')
+            )
+
     print("="*80)
-    print(f"Available Summaries ({len(summaries)} files)")
+    print(f"Available Summaries ({len(rows)} files)")
     print("="*80)
-    
-    for i, summary_file in enumerate(sorted(summaries), 1):
-        product_id = summary_file.stem
-        size = summary_file.stat().st_size
-        
+
+    # Bind the membership set to a local once; skips the module-global
+    # lookup on every iteration
+    catalog_ids = frozenset(DATA_CATALOG)
+
+    for i, (product_id, size) in enumerate(rows, 1):
         # Check if product is in catalog
-        marker = "✅" if product_id in DATA_CATALOG else "⚠️"
-        
+        marker = "✅" if product_id in catalog_ids else "⚠️"
+
         print(f"{i:2d}. {marker} {product_id:30s} ({size:,} bytes)")
-    
-    print(f"\nTotal: {len(summaries)} summaries")
+
+    print(f"\nTotal: {len(rows)} summaries")
 
 
 def regenerate_summary(product_id: str, max_rows: int = 50):
@@ -158,75 +346,71 @@ def regenerate_summary(product_id: str, max_rows: int = 50):
         print(f"❌ Product '{product_id}' not found in catalog")
         return
     
-    loader = DataLoader()
-    summary_dir = loader.data_dir / "summaries"
+    summary_dir = _summaries_dir()
     summary_dir.mkdir(exist_ok=True)
-    
+
     print(f"Regenerating summary for: {product_id}")
-    
-    try:
-        df = loader.load_product(product_id)
-        if df is None:
-            print(f"  ❌ Could not load data")
-            return
-        
-        # Use last rows for time series data
-        from_end = product_id in ['frequency_over_time', 'seasonality_heatmap']
-        summary = loader.get_data_summary(df, max_rows=max_rows, from_end=from_end)
-        details = DATA_CATALOG[product_id]
-        
-        header = f"""# Data Summary: {product_id}
-# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-# Description: {details['description']}
-# Source File: {details['file']}
-# Filter: {details['filter'] or 'None'}
-# Use Cases: {', '.join(details['use_cases'])}
-# Metrics: {', '.join(details['metrics'])}
-{'='*80}
 
-"""
-        
-        full_summary = header + summary
-        output_file = summary_dir / f"{product_id}.txt"
-        output_file.write_text(full_summary, encoding='utf-8')
-        
-        print(f"  ✅ Saved to {output_file.name} ({len(full_summary)} chars)")
-        
-    except Exception as e:
-        print(f"  ❌ Error: {e}")
+    _, ok, message = _build_one(product_id, str(summary_dir), max_rows)
+    print(message)
+
+    if ok:
+        try:
+            _update_index(summary_dir, {
+                product_id: _index_entry(summary_dir / f"{product_id}.txt")
+            })
+        except OSError as e:
+            print(f"⚠️  Could not update index.json: {e}")
+
+
+def _cmd_generate(args):
+    force = "--force" in args
+    args = [a for a in args if a != "--force"]
+    max_rows = int(args[0]) if args else 50
+    generate_all_summaries(max_rows=max_rows, force=force)
+
+
+def _cmd_view(args):
+    if not args:
+        print("Usage: python generate_summaries.py view <product_id>")
+    else:
+        view_summary(args[0])
+
+
+def _cmd_regenerate(args):
+    if not args:
+        print("Usage: python generate_summaries.py regenerate <product_id>")
+    else:
+        max_rows = int(args[1]) if len(args) > 1 else 50
+        regenerate_summary(args[0], max_rows=max_rows)
+
+
+# Command dispatch table (replaces the if/elif chain)
+COMMANDS = {
+    "generate": _cmd_generate,
+    "list": lambda args: list_summaries(),
+    "view": _cmd_view,
+    "regenerate": _cmd_regenerate,
+}
 
 
 def main():
-    """Main function with interactive menu"""
-    import sys
-    
+    """Main entry point: dispatch the CLI command"""
     if len(sys.argv) > 1:
         command = sys.argv[1]
-        
-        if command == "generate":
-            max_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 50
-            generate_all_summaries(max_rows=max_rows)
-        
-        elif command == "list":
-            list_summaries()
-        
-        elif command == "view":
-            if len(sys.argv) < 3:
-                print("Usage: python generate_summaries.py view <product_id>")
-            else:
-                view_summary(sys.argv[2])
-        
-        elif command == "regenerate":
-            if len(sys.argv) < 3:
-                print("Usage: python generate_summaries.py regenerate <product_id>")
-            else:
-                max_rows = int(sys.argv[3]) if len(sys.argv) > 3 else 50
-                regenerate_summary(sys.argv[2], max_rows=max_rows)
-        
-        else:
+        handler = COMMANDS.get(command)
+
+        if handler is None:
             print(f"Unknown command: {command}")
             print("Usage: python generate_summaries.py [generate|list|view|regenerate]")
-    
+            return
+
+        try:
+            handler(sys.argv[2:])
+        except ValueError:
+            # e.g. a non-numeric max_rows argument
+            print(f"❌ Invalid argument for '{command}' (max_rows must be a number)")
+
     else:
         # Default: generate all summaries
         generate_all_summaries()
@@ -2,30 +2,49 @@
 Gradium TTS and STT client wrapper.
 """
 
+import logging
 import os
 import gradium
 from typing import AsyncGenerator, Optional
 
+logger = logging.getLogger(__name__)
+
+# One underlying GradiumClient per api key, shared by every GradiumVoiceClient.
+# Apps that build a voice client per request would otherwise open a fresh
+# HTTP connection pool (and pay the TLS handshake) on every TTS/STT call.
+_CLIENT_CACHE: dict[str, "gradium.client.GradiumClient"] = {}
+
+# Known voice ids (see Gradium voice catalog / tests/test_gradium_key.py)
+DEFAULT_VOICE_JACK = "m86j6D7UZpGzHsNu"   # male, British
+DEFAULT_VOICE_EMMA = "YTpq7expH9539ERJ"
+
 
 class GradiumVoiceClient:
     """Client for Gradium Text-to-Speech and Speech-to-Text services."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, default_voice_id: Optional[str] = None):
         """
         Initialize Gradium client.
         
         Args:
             api_key: Gradium API key. If not provided, uses GRADIUM_API_KEY env var.
+            default_voice_id: Voice used when calls don't specify one
+                (defaults to Jack).
         """
         self.api_key = api_key or os.getenv("GRADIUM_API_KEY")
         if not self.api_key:
             raise ValueError("GRADIUM_API_KEY not found in environment variables")
         
-        self.client = gradium.client.GradiumClient(api_key=self.api_key)
+        client = _CLIENT_CACHE.get(self.api_key)
+        if client is None:
+            client = _CLIENT_CACHE.setdefault(
+                self.api_key, gradium.client.GradiumClient(api_key=self.api_key)
+            )
+        self.client = client
 
         # Default voice: Jack (male, British). Same as Gradium sample:
         #   result = await client.tts(setup={"model_name": "default", "voice_id": "m86j6D7UZpGzHsNu", "output_format": "wav"}, text="Hello, world!")
-        self.default_voice_id = "m86j6D7UZpGzHsNu"
+        self.default_voice_id = default_voice_id or DEFAULT_VOICE_JACK
         self.default_model = "default"
     
     async def text_to_speech(
@@ -81,13 +100,28 @@ class GradiumVoiceClient:
         }
         result = await self.client.tts(setup=setup, text=text)
         timestamps = []
-        if getattr(result, "text_with_timestamps", None):
-            for item in result.text_with_timestamps:
-                timestamps.append({
-                    "text": getattr(item, "text", str(item)) if not isinstance(item, dict) else item.get("text", ""),
-                    "start_s": getattr(item, "start_s", 0.0) if not isinstance(item, dict) else item.get("start_s", 0.0),
-                    "stop_s": getattr(item, "stop_s", 0.0) if not isinstance(item, dict) else item.get("stop_s", 0.0),
-                })
+        items = getattr(result, "text_with_timestamps", None)
+        if items:
+            # Items are homogeneous, so dispatch on the first one instead of
+            # re-checking isinstance three times per timestamp
+            if isinstance(items[0], dict):
+                timestamps = [
+                    {
+                        "text": item.get("text", ""),
+                        "start_s": item.get("start_s", 0.0),
+                        "stop_s": item.get("stop_s", 0.0),
+                    }
+                    for item in items
+                ]
+            else:
+                timestamps = [
+                    {
+                        "text": getattr(item, "text", str(item)),
+                        "start_s": getattr(item, "start_s", 0.0),
+                        "stop_s": getattr(item, "stop_s", 0.0),
+                    }
+                    for item in items
+                ]
         return result.raw_data, timestamps
 
     async def _stream_tts(self, text: str, setup: dict) -> AsyncGenerator[bytes, None]:
@@ -139,9 +173,12 @@ class GradiumVoiceClient:
         
         stream = await self.client.stt_stream(setup, audio_generator)
 
-        # Consume _stream and yield text messages; log raw API response for debugging
+        # Consume _stream and yield text messages; raw API responses go to
+        # debug logging - STT steps arrive ~12x/sec, so an unconditional
+        # print would stall the event loop on slow terminals
         async for message in stream._stream:
-            print(f"[STT] Gradium API raw: {message}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("STT raw: %s", message)
             if message.get("type") == "text":
                 text = message.get("text", "")
                 if text:
@@ -102,10 +102,17 @@ def test_file_structure():
         loader = DataLoader()
         missing = []
         found = []
-        
+
+        # One directory read instead of a stat per product
+        import os
+        try:
+            with os.scandir(loader.data_dir) as it:
+                present = {e.name for e in it if e.is_file()}
+        except OSError:
+            present = set()
+
         for product_id, details in DATA_CATALOG.items():
-            file_path = loader.data_dir / details["file"]
-            if file_path.exists():
+            if details["file"] in present:
                 found.append(details["file"])
             else:
                 missing.append(details["file"])
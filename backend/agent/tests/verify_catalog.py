@@ -22,12 +22,14 @@ def test_new_products():
         "top10_geographic_hotspots"
     ]
     
-    print(f"\n📊 Total products in catalog: {len(DATA_CATALOG)}")
+    catalog = DATA_CATALOG
+
+    print(f"\n📊 Total products in catalog: {len(catalog)}")
     print("\n✨ NEW Products:\n")
     
     for product_id in new_products:
-        if product_id in DATA_CATALOG:
-            product = DATA_CATALOG[product_id]
+        if product_id in catalog:
+            product = catalog[product_id]
             print(f"✅ {product_id}")
             print(f"   Description: {product['description']}")
             print(f"   Filter: {product['filter']}")
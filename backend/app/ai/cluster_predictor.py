@@ -9,25 +9,59 @@ This module provides functionality to:
 """
 
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import numpy as np
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from app.db.connection import get_conn
+from app.db.connection import get_conn, put_conn
+
+# Optional SIMD cosine kernels (AVX2/AVX-512/NEON fused multiply-add);
+# everything below falls back to NumPy/BLAS when not installed
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+# Optional ANN index over the cached centroid stacks; linear scans win at
+# today's centroid counts, but an HNSW index keeps lookups log-time as the
+# cluster tables grow
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+
+# The SentenceTransformer is loaded once per process; constructing it per
+# prediction would put the weight load and torch init (hundreds of ms) on
+# the request path every time
+_MODEL = None
+_MODEL_LOCK = threading.Lock()
+
+# Worker used to overlap the (independent) database fetches with model
+# inference inside predict_cluster
+_DB_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cluster-db")
 
 
 def get_embedding_model():
     """Load the embedding model (lazy loading to avoid loading if not needed)."""
-    try:
-        from sentence_transformers import SentenceTransformer
-        # Using the same model as vector_embedding.py for consistency
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-        return model
-    except ImportError:
-        raise ImportError(
-            "sentence-transformers not installed. Install with: pip install sentence-transformers"
-        )
+    global _MODEL
+    if _MODEL is None:
+        with _MODEL_LOCK:
+            if _MODEL is None:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                except ImportError:
+                    raise ImportError(
+                        "sentence-transformers not installed. Install with: pip install sentence-transformers"
+                    )
+                # Using the same model as vector_embedding.py for consistency
+                model = SentenceTransformer('all-MiniLM-L6-v2')
+                model.eval()
+                _MODEL = model
+    return _MODEL
 
 
 def parse_vector(embedding):
@@ -41,78 +75,236 @@ def parse_vector(embedding):
     
     # If it's a string (common with pgvector), parse it
     if isinstance(embedding, str):
-        # Remove brackets and split by comma
-        embedding = embedding.strip('[]')
-        values = [float(x.strip()) for x in embedding.split(',')]
-        return np.array(values, dtype=np.float32)
+        # numpy converts the split tokens in C - no Python-level float()
+        # call per element
+        return np.array(embedding.strip('[]').split(','), dtype=np.float32)
     
     # Try to convert directly (might work for some types)
     try:
         return np.array(embedding, dtype=np.float32)
     except (ValueError, TypeError):
         # Last resort: try parsing as string
-        embedding_str = str(embedding).strip('[]')
-        values = [float(x.strip()) for x in embedding_str.split(',')]
-        return np.array(values, dtype=np.float32)
+        return np.array(str(embedding).strip('[]').split(','), dtype=np.float32)
+
+
+# Parsed centroids cached across predict_cluster calls, keyed by a cheap
+# version probe of the clusters table; repeat predictions skip the two
+# fetches and all pgvector parsing until the table actually changes
+_CENTROID_CACHE = {"version": None, "top": None, "sub": None, "sub_index": None}
+
+
+def _get_clusters_version(conn):
+    """
+    Cheap change marker for the clusters table (max(updated_at), count(*)).
+    Returns None (disabling the cache) if the probe fails, e.g. when the
+    table has no updated_at column.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT max(updated_at), count(*) FROM clusters")
+        return cursor.fetchone()
+    except Exception:
+        conn.rollback()
+        return None
+    finally:
+        cursor.close()
+
+
+def build_sub_index(sub_clusters):
+    """
+    Index sub-cluster centroids by parent: {parent_id: {cluster_id: centroid}}.
+    Makes "children of parent X" an O(1) lookup instead of a filtering pass
+    over every sub-cluster.
+    """
+    sub_index = {}
+    for (parent_id, cluster_id), centroid in sub_clusters.items():
+        sub_index.setdefault(parent_id, {})[cluster_id] = centroid
+    return sub_index
+
+
+def _unit(vec):
+    """Scale a vector to unit norm in place (no-op for zero vectors)."""
+    norm = np.linalg.norm(vec)
+    if norm:
+        vec /= norm
+    return vec
 
 
 def get_all_cluster_centroids(conn):
     """
     Fetch all cluster centroids from the database.
     
+    Cached between calls: a version probe (_get_clusters_version) runs
+    first and the stored parse is reused when the table hasn't changed.
+    
     Returns:
         tuple: (top_clusters_dict, sub_clusters_dict)
             - top_clusters_dict: {cluster_id: centroid_vector}
             - sub_clusters_dict: {(parent_id, cluster_id): centroid_vector}
     """
-    cursor = conn.cursor()
-    
-    # Fetch top-level clusters (level=1)
+    version = _get_clusters_version(conn)
+    if version is not None and version == _CENTROID_CACHE["version"]:
+        return _CENTROID_CACHE["top"], _CENTROID_CACHE["sub"]
+    
+    # Both levels come back from one query (half the round-trips to
+    # Supabase) on a server-side named cursor, which streams rows in
+    # batches instead of materializing the result set before parsing
+    cursor = conn.cursor(name="centroids_all")
+    cursor.itersize = 1024
     cursor.execute("""
-        SELECT cluster_id, centroid
+        SELECT level, parent_cluster_id, cluster_id, centroid
         FROM clusters
-        WHERE level = 1 AND centroid IS NOT NULL
-        ORDER BY cluster_id
+        WHERE level IN (1, 2) AND centroid IS NOT NULL
+        ORDER BY level, parent_cluster_id, cluster_id
     """)
     top_clusters = {}
-    for cluster_id, centroid in cursor.fetchall():
-        parsed_centroid = parse_vector(centroid)
-        if parsed_centroid is not None:
-            top_clusters[int(cluster_id)] = parsed_centroid
-    
-    # Fetch sub-clusters (level=2)
-    cursor.execute("""
-        SELECT parent_cluster_id, cluster_id, centroid
-        FROM clusters
-        WHERE level = 2 AND centroid IS NOT NULL
-        ORDER BY parent_cluster_id, cluster_id
-    """)
     sub_clusters = {}
-    for parent_id, cluster_id, centroid in cursor.fetchall():
+    for level, parent_id, cluster_id, centroid in cursor:
         parsed_centroid = parse_vector(centroid)
-        if parsed_centroid is not None:
-            sub_clusters[(int(parent_id), int(cluster_id))] = parsed_centroid
-    
+        if parsed_centroid is None:
+            continue
+        if level == 1:
+            top_clusters[int(cluster_id)] = _unit(parsed_centroid)
+        else:
+            sub_clusters[(int(parent_id), int(cluster_id))] = _unit(parsed_centroid)
     cursor.close()
     
+    if version is not None:
+        sub_index = build_sub_index(sub_clusters)
+        _CENTROID_CACHE.update(
+            version=version,
+            top=top_clusters,
+            sub=sub_clusters,
+            sub_index=sub_index,
+        )
+        _rebuild_stack_cache(top_clusters, sub_clusters, sub_index)
+    
     return top_clusters, sub_clusters
 
 
 def cosine_similarity(vec1, vec2):
-    """Calculate cosine similarity between two vectors."""
-    vec1_norm = np.linalg.norm(vec1)
-    vec2_norm = np.linalg.norm(vec2)
+    """
+    Calculate cosine similarity between two unit-norm vectors.
     
-    if vec1_norm == 0 or vec2_norm == 0:
-        return 0.0
+    Embeddings are encoded with normalize_embeddings=True and centroids
+    are normalized when fetched, so this is a plain dot product - no norm
+    or sqrt work per pair. (For zero vectors the dot is 0.0, matching the
+    old convention.)
+    """
+    if simsimd is not None:
+        # simsimd.cosine tolerates non-normalized inputs from any
+        # external caller; nan (zero vector) maps to 0.0
+        sim = 1.0 - float(simsimd.cosine(
+            np.asarray(vec1, dtype=np.float32),
+            np.asarray(vec2, dtype=np.float32),
+        ))
+        return sim if np.isfinite(sim) else 0.0
+    
+    return float(np.dot(vec1, vec2))
+
+
+# Pre-stacked (and, with simsimd, int8-quantized) forms of the dicts held
+# in _CENTROID_CACHE, keyed by dict identity; rebuilt whenever the centroid
+# cache refreshes. Transient dicts (e.g. exclude_ids filters) are stacked
+# fresh per call and never enter this cache.
+_STACK_CACHE = {}
+
+
+def _quantize_i8(matrix):
+    """
+    Symmetric global int8 quantization. Cosine is scale-invariant, so the
+    scale factor doesn't need to be kept; good enough for picking the
+    nearest bucket, which is all the centroids are used for.
+    """
+    scale = float(np.max(np.abs(matrix))) or 1.0
+    return np.clip(np.round(matrix * (127.0 / scale)), -127, 127).astype(np.int8)
+
+
+def _stack_centroids(cluster_centroids, quantize=False):
+    """
+    Stack a centroid dict into (ids, row-normalized float32 matrix, int8
+    matrix or None). Reuses the prebuilt form for cached centroid dicts.
+    """
+    cached = _STACK_CACHE.get(id(cluster_centroids))
+    if cached is not None:
+        return cached
+    
+    ids = list(cluster_centroids.keys())
+    matrix = np.stack([np.asarray(c, dtype=np.float32) for c in cluster_centroids.values()])
+    norms = np.linalg.norm(matrix, axis=1)
+    norms[norms == 0] = 1.0  # zero centroids score 0, matching cosine_similarity
+    matrix /= norms[:, None]
+    mat_i8 = _quantize_i8(matrix) if (quantize and simsimd is not None) else None
+    
+    index = None
+    if quantize and faiss is not None:
+        # Inner product over unit-norm rows == cosine similarity
+        index = faiss.IndexHNSWFlat(matrix.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = 100
+        index.add(matrix)
+    
+    return ids, matrix, mat_i8, index
+
+
+def _rebuild_stack_cache(top_clusters, sub_clusters, sub_index):
+    """Pre-stack the cached centroid dicts so serving calls skip it."""
+    _STACK_CACHE.clear()
+    for centroids in (top_clusters, sub_clusters, *sub_index.values()):
+        if centroids:
+            _STACK_CACHE[id(centroids)] = _stack_centroids(centroids, quantize=True)
+
+
+def _normalize_query(query_embedding):
+    """Return the query as a unit-norm float32 vector."""
+    q = np.asarray(query_embedding, dtype=np.float32)
+    q_norm = np.linalg.norm(q)
+    return q / q_norm if q_norm else q
+
+
+# Reusable per-thread score buffers, keyed by length: at small centroid
+# counts the per-call ndarray allocation rivals the actual FLOPs
+_SIM_BUFS = threading.local()
+
+
+def _sim_buffer(n):
+    """Thread-local float32 buffer of length n for similarity scores."""
+    by_size = getattr(_SIM_BUFS, "by_size", None)
+    if by_size is None:
+        by_size = _SIM_BUFS.by_size = {}
+    buf = by_size.get(n)
+    if buf is None:
+        buf = by_size[n] = np.empty(n, dtype=np.float32)
+    return buf
+
+
+def _similarities(matrix, q, mat_i8=None):
+    """
+    Cosine similarities of a unit-norm query against the unit-norm rows of
+    a stacked centroid matrix: int8 simsimd kernels (VNNI/NEON dot-product)
+    for prebuilt quantized stacks, float simsimd otherwise, and a single
+    BLAS gemv when simsimd isn't installed.
     
-    return np.dot(vec1, vec2) / (vec1_norm * vec2_norm)
+    The BLAS path writes into a reused thread-local buffer; callers must
+    finish (or copy) the scores before scoring again on the same thread.
+    """
+    if simsimd is not None:
+        if mat_i8 is not None:
+            q_i8 = _quantize_i8(q)[None, :]
+            sims = 1.0 - np.asarray(simsimd.cdist(q_i8, mat_i8, metric="cosine"))[0]
+        else:
+            sims = 1.0 - np.asarray(simsimd.cdist(q[None, :], matrix, metric="cosine"))[0]
+        return np.nan_to_num(sims, copy=False)
+    return np.dot(matrix, q, out=_sim_buffer(matrix.shape[0]))
 
 
 def find_closest_cluster(query_embedding, cluster_centroids):
     """
     Find the closest cluster to the query embedding using cosine similarity.
     
+    All centroids are scored with a single matrix-vector product over a
+    stacked, pre-normalized matrix instead of one Python-level
+    cosine_similarity call per centroid.
+    
     Args:
         query_embedding: numpy array of the query embedding
         cluster_centroids: dict mapping cluster_id -> centroid vector
@@ -123,22 +315,25 @@ def find_closest_cluster(query_embedding, cluster_centroids):
     if not cluster_centroids:
         return None, 0.0
     
-    best_cluster_id = None
-    best_similarity = -1.0
+    ids, matrix, mat_i8, index = _stack_centroids(cluster_centroids)
+    q = _normalize_query(query_embedding)
     
-    for cluster_id, centroid in cluster_centroids.items():
-        similarity = cosine_similarity(query_embedding, centroid)
-        if similarity > best_similarity:
-            best_similarity = similarity
-            best_cluster_id = cluster_id
+    if index is not None:
+        sims, rows = index.search(q[None, :], 1)
+        return ids[int(rows[0][0])], float(sims[0][0])
     
-    return best_cluster_id, best_similarity
+    sims = _similarities(matrix, q, mat_i8)
+    best = int(np.argmax(sims))
+    return ids[best], float(sims[best])
 
 
 def find_closest_clusters_sorted(query_embedding, cluster_centroids, exclude_ids=None):
     """
     Find all clusters sorted by similarity (descending).
     
+    Scored the same way as find_closest_cluster: one matrix-vector product,
+    then an argsort, rather than a per-centroid Python loop.
+    
     Args:
         query_embedding: numpy array of the query embedding
         cluster_centroids: dict mapping cluster_id -> centroid vector
@@ -150,18 +345,62 @@ def find_closest_clusters_sorted(query_embedding, cluster_centroids, exclude_ids
     if not cluster_centroids:
         return []
     
-    exclude_ids = exclude_ids or set()
-    
-    similarities = []
-    for cluster_id, centroid in cluster_centroids.items():
-        if cluster_id not in exclude_ids:
-            similarity = cosine_similarity(query_embedding, centroid)
-            similarities.append((cluster_id, similarity))
-    
-    # Sort by similarity descending
-    similarities.sort(key=lambda x: x[1], reverse=True)
+    ids, matrix, mat_i8, index = _stack_centroids(cluster_centroids)
+    q = _normalize_query(query_embedding)
+    
+    if index is not None and not exclude_ids:
+        # HNSW returns candidates already sorted by inner product
+        sims, rows = index.search(q[None, :], len(ids))
+        return [
+            (ids[int(row)], float(sim))
+            for row, sim in zip(rows[0], sims[0])
+            if row >= 0
+        ]
+    
+    sims = _similarities(matrix, q, mat_i8)
+    if exclude_ids:
+        # Mask excluded rows to -inf rather than rebuilding (and
+        # re-stacking) a filtered dict, which would also bypass the
+        # cached prebuilt stacks
+        excluded_rows = [i for i, cluster_id in enumerate(ids) if cluster_id in exclude_ids]
+        sims[excluded_rows] = -np.inf
+        order = np.argsort(-sims)
+        return [(ids[i], float(sims[i])) for i in order if np.isfinite(sims[i])]
+    
+    order = np.argsort(-sims)
+    return [(ids[i], float(sims[i])) for i in order]
+
+
+def iter_closest_clusters(query_embedding, cluster_centroids, top_k=32):
+    """
+    Yield (cluster_id, similarity) pairs in descending-similarity order.
     
-    return similarities
+    The first top_k candidates are selected with an O(N) argpartition and
+    a small sort; the remainder is only ranked if the consumer exhausts
+    them. The fallback walk usually stops within the first few, so this
+    skips the full O(N log N) sort in the common case.
+    """
+    if not cluster_centroids:
+        return
+    
+    ids, matrix, mat_i8, _ = _stack_centroids(cluster_centroids)
+    # Snapshot the scores: this generator yields lazily, and the consumer
+    # may run another scan (which reuses the thread-local buffer) between
+    # yields
+    sims = _similarities(matrix, _normalize_query(query_embedding), mat_i8).copy()
+    
+    n = len(ids)
+    k = min(top_k, n)
+    head = np.argpartition(-sims, k - 1)[:k] if k < n else np.arange(n)
+    head = head[np.argsort(-sims[head])]
+    for i in head:
+        yield ids[int(i)], float(sims[int(i)])
+    
+    if k < n:
+        head_set = set(int(i) for i in head)
+        for i in np.argsort(-sims):
+            if int(i) not in head_set:
+                yield ids[int(i)], float(sims[int(i)])
 
 
 def get_cluster_labels(conn, parent_cluster_id, child_cluster_id):
@@ -211,6 +450,30 @@ def cluster_has_examples(conn, parent_cluster_id, child_cluster_id):
     return get_cluster_record_count(conn, parent_cluster_id, child_cluster_id) > 0
 
 
+def get_non_empty_clusters(conn):
+    """
+    Fetch the set of (top_cluster_id, sub_cluster_id) pairs that have at
+    least one request, in a single DISTINCT query.
+    
+    The fallback search in predict_cluster probes many candidate clusters;
+    checking membership in this set replaces one COUNT round-trip per
+    candidate. Fetched per prediction rather than cached with the
+    centroids because the requests table changes independently.
+    
+    Returns:
+        frozenset: {(top_cluster_id, sub_cluster_id), ...}
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT DISTINCT top_cluster_id, sub_cluster_id
+        FROM requests
+        WHERE top_cluster_id IS NOT NULL AND sub_cluster_id IS NOT NULL
+    """)
+    pairs = frozenset((int(top_id), int(sub_id)) for top_id, sub_id in cursor.fetchall())
+    cursor.close()
+    return pairs
+
+
 def get_cluster_record_count(conn, parent_cluster_id, child_cluster_id):
     """
     Return the number of records in a cluster.
@@ -256,19 +519,36 @@ def predict_cluster(text_input, conn=None, model=None):
     if model is None:
         model = get_embedding_model()
     
-    # Generate embedding for input text
-    query_embedding = model.encode(text_input, show_progress_bar=False, convert_to_numpy=True)
-    query_embedding = query_embedding.astype(np.float32)
-    
     # Get database connection if not provided
     should_close_conn = False
     if conn is None:
         conn = get_conn()
         should_close_conn = True
-    
+
+    db_future = None
     try:
-        # Get all cluster centroids
-        top_clusters, sub_clusters = get_all_cluster_centroids(conn)
+        # The database fetches don't depend on the query text, so they run
+        # on a worker thread while the model encodes. Both run sequentially
+        # on the worker because psycopg2 connections aren't safe for
+        # concurrent cursors; the main thread doesn't touch conn until the
+        # future resolves.
+        db_future = _DB_EXECUTOR.submit(
+            lambda: (get_all_cluster_centroids(conn), get_non_empty_clusters(conn))
+        )
+
+        # Generate embedding for input text
+        query_embedding = model.encode(
+            text_input, show_progress_bar=False, convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        query_embedding = query_embedding.astype(np.float32)
+
+        (top_clusters, sub_clusters), non_empty_clusters = db_future.result()
+        sub_index = (
+            _CENTROID_CACHE["sub_index"]
+            if _CENTROID_CACHE["sub"] is sub_clusters
+            else build_sub_index(sub_clusters)
+        )
         
         if not top_clusters:
             raise ValueError("No top-level clusters found in database. Run clustering first.")
@@ -279,137 +559,45 @@ def predict_cluster(text_input, conn=None, model=None):
         if parent_cluster_id is None:
             raise ValueError("Could not find a matching parent cluster.")
         
-        # Find closest sub-cluster within the parent cluster
-        # Filter sub_clusters to only those with matching parent_id
-        parent_sub_clusters = {
-            (p_id, c_id): centroid
-            for (p_id, c_id), centroid in sub_clusters.items()
-            if p_id == parent_cluster_id
-        }
+        # Find closest sub-cluster within the parent cluster (O(1) lookup
+        # in the parent -> children index instead of filtering every key)
+        parent_sub_clusters = sub_index.get(parent_cluster_id, {})
         
         child_cluster_id = None
         child_similarity = 0.0
         
         if parent_sub_clusters:
             # Find closest sub-cluster
-            # We need to extract just the cluster_id from the tuple key
-            sub_clusters_simple = {
-                c_id: centroid
-                for (p_id, c_id), centroid in parent_sub_clusters.items()
-            }
-            child_cluster_id, child_similarity = find_closest_cluster(query_embedding, sub_clusters_simple)
+            child_cluster_id, child_similarity = find_closest_cluster(query_embedding, parent_sub_clusters)
         else:
             # If no sub-clusters exist for this parent, default to 0
             child_cluster_id = 0
             child_similarity = 0.0
         
-        # Check if the predicted cluster has examples, if not find the next closest non-empty cluster
-        if not cluster_has_examples(conn, parent_cluster_id, child_cluster_id):
-            # Try to find a non-empty child cluster within the same parent
-            if parent_sub_clusters:
-                sub_clusters_simple = {
-                    c_id: centroid
-                    for (p_id, c_id), centroid in parent_sub_clusters.items()
-                }
-                sorted_child_clusters = find_closest_clusters_sorted(
-                    query_embedding, 
-                    sub_clusters_simple,
-                    exclude_ids={child_cluster_id} if child_cluster_id is not None else None
-                )
-                
-                # Try each child cluster until we find one with examples
-                found_non_empty = False
-                for candidate_child_id, candidate_similarity in sorted_child_clusters:
-                    if cluster_has_examples(conn, parent_cluster_id, candidate_child_id):
+        # Check if the predicted cluster has examples (non_empty_clusters
+        # was prefetched above); if not, score every
+        # (parent, child) centroid in one stacked pass and walk the sorted
+        # pairs until the first non-empty one - a single matmul plus argsort
+        # instead of the old nested parent-then-child rescans
+        if (parent_cluster_id, child_cluster_id) not in non_empty_clusters:
+            found_non_empty = False
+            if sub_clusters:
+                for (candidate_parent_id, candidate_child_id), candidate_sim in \
+                        iter_closest_clusters(query_embedding, sub_clusters):
+                    if (candidate_parent_id, candidate_child_id) in non_empty_clusters:
+                        if candidate_parent_id != parent_cluster_id:
+                            parent_similarity = (
+                                cosine_similarity(query_embedding, top_clusters[candidate_parent_id])
+                                if candidate_parent_id in top_clusters else 0.0
+                            )
+                            parent_cluster_id = candidate_parent_id
                         child_cluster_id = candidate_child_id
-                        child_similarity = candidate_similarity
+                        child_similarity = candidate_sim
                         found_non_empty = True
                         break
-                
-                # If no child clusters in this parent have examples, try other parents
-                if not found_non_empty:
-                    sorted_parent_clusters = find_closest_clusters_sorted(
-                        query_embedding,
-                        top_clusters,
-                        exclude_ids={parent_cluster_id}
-                    )
-                    
-                    # Try each parent cluster until we find one with a non-empty child cluster
-                    for candidate_parent_id, candidate_parent_sim in sorted_parent_clusters:
-                        # Get child clusters for this parent
-                        candidate_parent_sub_clusters = {
-                            (p_id, c_id): centroid
-                            for (p_id, c_id), centroid in sub_clusters.items()
-                            if p_id == candidate_parent_id
-                        }
-                        
-                        if candidate_parent_sub_clusters:
-                            candidate_sub_simple = {
-                                c_id: centroid
-                                for (p_id, c_id), centroid in candidate_parent_sub_clusters.items()
-                            }
-                            sorted_candidate_children = find_closest_clusters_sorted(
-                                query_embedding,
-                                candidate_sub_simple
-                            )
-                            
-                            # Try each child cluster in this parent
-                            for candidate_child_id, candidate_child_sim in sorted_candidate_children:
-                                if cluster_has_examples(conn, candidate_parent_id, candidate_child_id):
-                                    parent_cluster_id = candidate_parent_id
-                                    parent_similarity = candidate_parent_sim
-                                    child_cluster_id = candidate_child_id
-                                    child_similarity = candidate_child_sim
-                                    found_non_empty = True
-                                    break
-                            
-                            if found_non_empty:
-                                break
-                    
-                    if not found_non_empty:
-                        raise ValueError("No non-empty clusters found in database.")
-            else:
-                # No sub-clusters for this parent, try other parents
-                sorted_parent_clusters = find_closest_clusters_sorted(
-                    query_embedding,
-                    top_clusters,
-                    exclude_ids={parent_cluster_id}
-                )
-                
-                found_non_empty = False
-                for candidate_parent_id, candidate_parent_sim in sorted_parent_clusters:
-                    # Get child clusters for this parent
-                    candidate_parent_sub_clusters = {
-                        (p_id, c_id): centroid
-                        for (p_id, c_id), centroid in sub_clusters.items()
-                        if p_id == candidate_parent_id
-                    }
-                    
-                    if candidate_parent_sub_clusters:
-                        candidate_sub_simple = {
-                            c_id: centroid
-                            for (p_id, c_id), centroid in candidate_parent_sub_clusters.items()
-                        }
-                        sorted_candidate_children = find_closest_clusters_sorted(
-                            query_embedding,
-                            candidate_sub_simple
-                        )
-                        
-                        # Try each child cluster in this parent
-                        for candidate_child_id, candidate_child_sim in sorted_candidate_children:
-                            if cluster_has_examples(conn, candidate_parent_id, candidate_child_id):
-                                parent_cluster_id = candidate_parent_id
-                                parent_similarity = candidate_parent_sim
-                                child_cluster_id = candidate_child_id
-                                child_similarity = candidate_child_sim
-                                found_non_empty = True
-                                break
-                        
-                        if found_non_empty:
-                            break
-                
-                if not found_non_empty:
-                    raise ValueError("No non-empty clusters found in database.")
+            
+            if not found_non_empty:
+                raise ValueError("No non-empty clusters found in database.")
         
         parent_label, child_label = get_cluster_labels(conn, parent_cluster_id, child_cluster_id or 0)
         record_count = get_cluster_record_count(conn, parent_cluster_id, child_cluster_id or 0)
@@ -425,10 +613,137 @@ def predict_cluster(text_input, conn=None, model=None):
         }
         
         return result
+
+    finally:
+        # If encode (or anything after the submit) raised, the worker may
+        # still be mid-query on this connection; wait for it before handing
+        # the connection back so the next borrower gets an idle one. result()
+        # also retrieves the worker's exception so it isn't left unobserved.
+        if db_future is not None:
+            try:
+                db_future.result()
+            except Exception:
+                pass  # the primary error is already propagating
+        if should_close_conn:
+            put_conn(conn)
+
+
+
+def predict_clusters(text_inputs, conn=None, model=None):
+    """
+    Predict clusters for a batch of text inputs.
+    
+    Encodes every text in one model.encode call and scores all queries
+    against the stacked top-level centroids with a single matrix-matrix
+    product; children and any empty-cluster fallback are then resolved
+    per query. Much cheaper than calling predict_cluster per text for
+    ingestion or evaluation workloads.
+    
+    Args:
+        text_inputs: List of text strings
+        conn: Database connection (optional, will create if not provided)
+        model: SentenceTransformer model (optional, will load if not provided)
+    
+    Returns:
+        list: One predict_cluster-style result dict per input text
+    """
+    if not text_inputs:
+        return []
+    
+    if model is None:
+        model = get_embedding_model()
     
+    should_close_conn = False
+    if conn is None:
+        conn = get_conn()
+        should_close_conn = True
+
+    db_future = None
+    try:
+        db_future = _DB_EXECUTOR.submit(
+            lambda: (get_all_cluster_centroids(conn), get_non_empty_clusters(conn))
+        )
+
+        embeddings = model.encode(
+            list(text_inputs), show_progress_bar=False, convert_to_numpy=True,
+            normalize_embeddings=True, batch_size=64,
+        ).astype(np.float32)
+        
+        (top_clusters, sub_clusters), non_empty_clusters = db_future.result()
+        
+        if not top_clusters:
+            raise ValueError("No top-level clusters found in database. Run clustering first.")
+        
+        sub_index = (
+            _CENTROID_CACHE["sub_index"]
+            if _CENTROID_CACHE["sub"] is sub_clusters
+            else build_sub_index(sub_clusters)
+        )
+        
+        top_ids, top_mat, _, _ = _stack_centroids(top_clusters)
+        # One gemm scores every query against every parent centroid
+        top_sims = embeddings @ top_mat.T
+        best_rows = np.argmax(top_sims, axis=1)
+        
+        results = []
+        for i in range(len(embeddings)):
+            query_embedding = embeddings[i]
+            parent_cluster_id = top_ids[int(best_rows[i])]
+            parent_similarity = float(top_sims[i, best_rows[i]])
+            
+            parent_sub_clusters = sub_index.get(parent_cluster_id, {})
+            if parent_sub_clusters:
+                child_cluster_id, child_similarity = find_closest_cluster(
+                    query_embedding, parent_sub_clusters
+                )
+            else:
+                child_cluster_id, child_similarity = 0, 0.0
+            
+            # Same empty-cluster fallback as predict_cluster
+            if (parent_cluster_id, child_cluster_id) not in non_empty_clusters:
+                found_non_empty = False
+                for (candidate_parent_id, candidate_child_id), candidate_sim in \
+                        iter_closest_clusters(query_embedding, sub_clusters):
+                    if (candidate_parent_id, candidate_child_id) in non_empty_clusters:
+                        if candidate_parent_id != parent_cluster_id:
+                            parent_similarity = (
+                                cosine_similarity(query_embedding, top_clusters[candidate_parent_id])
+                                if candidate_parent_id in top_clusters else 0.0
+                            )
+                            parent_cluster_id = candidate_parent_id
+                        child_cluster_id = candidate_child_id
+                        child_similarity = candidate_sim
+                        found_non_empty = True
+                        break
+                
+                if not found_non_empty:
+                    raise ValueError("No non-empty clusters found in database.")
+            
+            parent_label, child_label = get_cluster_labels(conn, parent_cluster_id, child_cluster_id or 0)
+            record_count = get_cluster_record_count(conn, parent_cluster_id, child_cluster_id or 0)
+            results.append({
+                'parent_cluster_id': parent_cluster_id,
+                'child_cluster_id': child_cluster_id if child_cluster_id is not None else 0,
+                'parent_similarity': parent_similarity,
+                'child_similarity': float(child_similarity),
+                'text_embedding': query_embedding,
+                'parent_label': parent_label,
+                'child_label': child_label,
+                'record_count': record_count,
+            })
+        
+        return results
+
     finally:
+        # Same as predict_cluster: don't re-pool the connection while the
+        # worker may still be using it, and retrieve the worker's exception
+        if db_future is not None:
+            try:
+                db_future.result()
+            except Exception:
+                pass  # the primary error is already propagating
         if should_close_conn:
-            conn.close()
+            put_conn(conn)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+"""
+Semantic response cache for Gemini-backed endpoints.
+
+The Gemini client already memoizes exact repeat prompts; this layer also
+catches near-duplicates ("show me the backlog" vs "what's the backlog") by
+comparing question embeddings, turning a 500-1500ms LLM round-trip into a
+~1ms in-memory vector lookup on a hit.
+
+Reuses the sentence-transformers model from the cluster predictor; when
+that stack isn't installed the cache simply reports misses.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+import numpy as np
+
+# Same optional dependency chain as the cluster predictor (sentence-transformers)
+try:
+    from app.ai.cluster_predictor import get_embedding_model
+except Exception:
+    get_embedding_model = None  # type: ignore[misc, assignment]
+
+# Cosine similarity a near-duplicate question must reach to reuse a response
+DEFAULT_THRESHOLD = 0.92
+DEFAULT_MAX_ENTRIES = 1000
+
+
+class SemanticCache:
+    """In-process LRU cache keyed on question embeddings.
+
+    Entries live in namespaces (e.g. "simple_chat", "plan:<catalog hash>")
+    so answers for one prompt template never satisfy another.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # (namespace, normalized question) -> (unit embedding, cached value)
+        self._entries: "OrderedDict[tuple, tuple[np.ndarray, Any]]" = OrderedDict()
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        if get_embedding_model is None:
+            return None
+        try:
+            model = get_embedding_model()
+            return model.encode(text, normalize_embeddings=True).astype(np.float32)
+        except Exception:
+            return None  # model unavailable; treat every lookup as a miss
+
+    def lookup(self, text: str, namespace: str = "") -> tuple:
+        """
+        Look up a semantically similar cached response.
+
+        Blocking (runs the embedding model); call via asyncio.to_thread from
+        async code.
+
+        Returns:
+            (value, embedding) - value is None on a miss; the embedding is
+            returned either way so a following store() doesn't re-encode.
+        """
+        key = (namespace, text.strip().lower())
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                # Exact repeat: no embedding needed
+                self._entries.move_to_end(key)
+                return hit[1], hit[0]
+
+        embedding = self._embed(text)
+        if embedding is None:
+            return None, None
+
+        with self._lock:
+            best_value = None
+            best_sim = self.threshold
+            # Brute-force cosine scan: entries are unit vectors and the cache
+            # is capped at max_entries, so this stays well under a millisecond
+            for (ns, _), (vec, value) in self._entries.items():
+                if ns != namespace:
+                    continue
+                sim = float(np.dot(vec, embedding))
+                if sim >= best_sim:
+                    best_sim = sim
+                    best_value = value
+            return best_value, embedding
+
+    def store(self, text: str, embedding: Optional[np.ndarray], value: Any,
+              namespace: str = "") -> None:
+        """Insert a response; evicts least-recently-used entries past the cap"""
+        if embedding is None or value is None:
+            return
+        key = (namespace, text.strip().lower())
+        with self._lock:
+            self._entries[key] = (embedding, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Shared instance used by the API endpoints
+response_cache = SemanticCache()
@@ -1,10 +1,40 @@
 import psycopg2
+from psycopg2.pool import ThreadedConnectionPool, PoolError
 import os
+import threading
 from dotenv import load_dotenv
 from urllib.parse import urlparse
 
 load_dotenv()
 
+# Process-wide connection pool: a fresh psycopg2.connect against the
+# Supabase pooler costs a TCP+TLS handshake plus auth (tens to hundreds
+# of ms), so connections are reused across requests. Callers should hand
+# connections back with put_conn(); close() still works but permanently
+# consumes a pool slot, so the pool-exhausted path falls back to a
+# direct connection.
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def _print_connection_troubleshooting(e, hostname):
+    error_str = str(e)
+    print(f"\n[ERROR] Connection Error: {e}")
+    print(f"\n[TROUBLESHOOTING]")
+
+    if "could not translate host name" in error_str.lower() or "name or service not known" in error_str.lower():
+        print("DNS Resolution Failed")
+        if hostname:
+            print(f"Current hostname: {hostname}")
+    elif "password authentication failed" in error_str.lower():
+        print("Authentication Failed - Password is incorrect")
+    elif "timeout" in error_str.lower():
+        print("Connection Timeout - Network or firewall issue")
+    else:
+        print("Verify the DATABASE_URL in your .env file is correct")
+        if hostname:
+            print("Check if the Supabase project '{hostname}' exists and is active")
+
 def validate_connection_string_format(db_url):
     if not db_url:
         return False, None, "DATABASE_URL is empty"
@@ -49,27 +79,57 @@ def get_conn():
         print(f"\n[INFO] Note: If your password contains special characters, you may need to URL-encode them")
         raise ValueError(f"Invalid connection string format: {error_msg}")
     
+    global _POOL
     try:
-        return psycopg2.connect(db_url)
+        if _POOL is None:
+            with _POOL_LOCK:
+                if _POOL is None:
+                    # The first connection is opened here (minconn=1)
+                    _POOL = ThreadedConnectionPool(1, 10, db_url)
+        conn = _POOL.getconn()
+    except PoolError:
+        # Pool exhausted (e.g. callers that close() instead of put_conn);
+        # degrade to a one-off direct connection
+        try:
+            conn = psycopg2.connect(db_url)
+        except psycopg2.OperationalError as e:
+            _print_connection_troubleshooting(e, hostname)
+            raise
     except psycopg2.OperationalError as e:
-        error_str = str(e)
-        print(f"\n[ERROR] Connection Error: {e}")
-        print(f"\n[TROUBLESHOOTING]")
-        
-        if "could not translate host name" in error_str.lower() or "name or service not known" in error_str.lower():
-            print("DNS Resolution Failed")
-            if hostname:
-                print(f"Current hostname: {hostname}")
-        elif "password authentication failed" in error_str.lower():
-            print("Authentication Failed - Password is incorrect")
-        elif "timeout" in error_str.lower():
-            print("Connection Timeout - Network or firewall issue")
-        else:
-            print("Verify the DATABASE_URL in your .env file is correct")
-            if hostname:
-                print("Check if the Supabase project '{hostname}' exists and is active")
+        _print_connection_troubleshooting(e, hostname)
         raise
 
+    # Return pgvector columns as numpy arrays directly, skipping the text
+    # round-trip; optional - consumers still handle the string format
+    try:
+        from pgvector.psycopg2 import register_vector
+        register_vector(conn)
+    except Exception:
+        pass
+
+    return conn
+
+
+def put_conn(conn):
+    """
+    Return a connection obtained from get_conn to the pool.
+    
+    Closed connections are discarded, and connections created by the
+    pool-exhausted fallback are simply closed.
+    """
+    pool = _POOL
+    if pool is None:
+        conn.close()
+        return
+    try:
+        pool.putconn(conn, close=conn.closed)
+    except (PoolError, KeyError):
+        # Not one of the pool's connections
+        try:
+            conn.close()
+        except Exception:
+            pass
+
 if __name__ == "__main__":
     try:
         db_url = os.getenv("DATABASE_URL")
@@ -36,6 +36,7 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse, Response
 from pydantic import BaseModel
+from sse_starlette.sse import EventSourceResponse
 from datetime import datetime
 
 # Optional: report generator (reportlab + reporting package)
@@ -50,13 +51,14 @@ except Exception as e:
         "Report generator unavailable (install reportlab?): %s", _report_generator_error
     )
     ReportGenerator = None  # type: ignore[misc, assignment]
-import json
+import hashlib
 import asyncio
 from typing import AsyncGenerator
 import base64
 
 from agent.agent import CRMAnalyticsAgent
-from agent.gemini_client import GeminiAgent
+from agent.gemini_client import GeminiAgent, MAX_SUMMARY
+from agent.fastjson import dumps as json_dumps
 
 # Optional: cluster predictor (needs DATABASE_URL + sentence-transformers)
 try:
@@ -69,9 +71,10 @@ except Exception:
     get_cluster_labels = None  # type: ignore[misc, assignment]
 
 try:
-    from app.db.connection import get_conn
+    from app.db.connection import get_conn, put_conn
 except Exception:
     get_conn = None  # type: ignore[misc, assignment]
+    put_conn = None  # type: ignore[misc, assignment]
 
 # Optional: Gradium voice (TTS/STT); app runs without it if package unavailable
 try:
@@ -79,6 +82,12 @@ try:
 except ImportError:
     GradiumVoiceClient = None  # type: ignore[misc, assignment]
 
+# Optional: semantic response cache (reuses the cluster predictor's embedding model)
+try:
+    from app.cache import response_cache
+except Exception:
+    response_cache = None  # type: ignore[assignment]
+
 app = FastAPI(title="CRM Analytics API")
 
 # Configure CORS for frontend
@@ -116,6 +125,74 @@ else:
 # True after the user has entered analysis mode at least once (used to gate the "deep research" message in chat)
 _has_entered_analysis_mode = False
 
+# Plan SSE payload: everything but the plan list itself is constant, so the
+# envelope is serialized once and the per-request plan JSON spliced in
+_PLAN_FRAME_PREFIX = '{"type": "plan", "content": "Selected data products:", "data": {"plan": '
+_PLAN_FRAME_SUFFIX = "}}"
+
+# Static SSE payloads serialized once at import; the stream generators yield
+# these as-is instead of re-serializing per request
+_FRAME_START = json_dumps({'type': 'start', 'content': 'Processing your question...'})
+_FRAME_THINKING = json_dumps({'type': 'start', 'content': 'Thinking...'})
+_FRAME_ACK_CHAT = json_dumps({'type': 'chat', 'content': 'Awesome, lets do it'})
+_FRAME_GLOW_ON = json_dumps({'type': 'glow_on'})
+_FRAME_PLANNING = json_dumps({'type': 'thought', 'content': '🤔 Analyzing your question and planning which data to use...'})
+_FRAME_ANALYZING = json_dumps({'type': 'thought', 'content': '🧠 Analyzing data and generating insights...'})
+_FRAME_RAW_DATA = json_dumps({'type': 'thought', 'content': 'Loading raw data (no summaries available)...'})
+_FRAME_COMPLETE_DONE = json_dumps({'type': 'complete', 'content': 'Done'})
+_FRAME_COMPLETE_ENDED = json_dumps({'type': 'complete', 'content': 'Stream ended'})
+_FRAME_COMPLETE_ANALYSIS = json_dumps({'type': 'complete', 'content': 'Analysis complete'})
+
+# Per-product "Loading..." thoughts: small fixed vocabulary, filled lazily
+_LOADING_FRAMES: dict = {}
+
+
+def _loading_frame(product_name: str) -> str:
+    frame = _LOADING_FRAMES.get(product_name)
+    if frame is None:
+        frame = _LOADING_FRAMES[product_name] = json_dumps(
+            {'type': 'thought', 'content': f'📊 Loading {product_name}...'}
+        )
+    return frame
+
+
+def _refresh_catalog_state():
+    """Recompute the planning-stage context and swap it onto app.state.
+
+    Single attribute assignments, so in-flight requests see either the old
+    or the new value - never a half-built one.
+    """
+    app.state.catalog_summary = agent.catalog_summary
+    app.state.frequency_preview = agent._get_frequency_preview()
+
+
+@app.on_event("startup")
+async def _cache_catalog_on_startup():
+    """Precompute catalog summary + frequency preview once instead of per request"""
+    app.state.catalog_summary = ""
+    app.state.frequency_preview = ""
+    if agent:
+        try:
+            await asyncio.to_thread(_refresh_catalog_state)
+        except Exception as e:
+            print(f"Warning: Could not precompute catalog state: {e}")
+
+
+@app.post("/api/admin/refresh-catalog")
+async def refresh_catalog():
+    """
+    Recompute the cached catalog summary and frequency preview
+    (e.g. after regenerating the CSVs/summaries) without a restart
+    """
+    if not agent:
+        raise HTTPException(status_code=500, detail="Agent not initialized")
+    await asyncio.to_thread(_refresh_catalog_state)
+    return {
+        "status": "refreshed",
+        "catalog_summary_chars": len(app.state.catalog_summary),
+        "frequency_preview_chars": len(app.state.frequency_preview),
+    }
+
 
 class ChatRequest(BaseModel):
     message: str
@@ -134,14 +211,13 @@ async def stream_analysis_ack(user_question: str) -> AsyncGenerator[str, None]:
     APIs are called as normal; response is just "Awesome, lets do it" then complete.
     """
     try:
-        yield f"data: {json.dumps({'type': 'start', 'content': 'Thinking...'})}\n\n"
-        await asyncio.sleep(0.1)
-        yield f"data: {json.dumps({'type': 'chat', 'content': 'Awesome, lets do it'})}\n\n"
-        yield f"data: {json.dumps({'type': 'complete', 'content': 'Done'})}\n\n"
+        yield _FRAME_THINKING
+        yield _FRAME_ACK_CHAT
+        yield _FRAME_COMPLETE_DONE
     except Exception as e:
         error_msg = f"Error: {str(e)}"
-        yield f"data: {json.dumps({'type': 'error', 'content': error_msg})}\n\n"
-        yield f"data: {json.dumps({'type': 'complete', 'content': 'Stream ended'})}\n\n"
+        yield json_dumps({'type': 'error', 'content': error_msg})
+        yield _FRAME_COMPLETE_ENDED
 
 
 async def stream_simple_chat(user_question: str) -> AsyncGenerator[str, None]:
@@ -152,8 +228,7 @@ async def stream_simple_chat(user_question: str) -> AsyncGenerator[str, None]:
     Only says the "deep research" message if the user has already entered analysis mode at least once.
     """
     try:
-        yield f"data: {json.dumps({'type': 'start', 'content': 'Thinking...'})}\n\n"
-        await asyncio.sleep(0.1)
+        yield _FRAME_THINKING
 
         # Only say the "deep research" message if user has previously entered analysis mode
         if _has_entered_analysis_mode:
@@ -161,8 +236,8 @@ async def stream_simple_chat(user_question: str) -> AsyncGenerator[str, None]:
                 "That's a great idea, I'm going to enter deep research and generate "
                 "a report based on my findings."
             )
-            yield f"data: {json.dumps({'type': 'chat', 'content': response})}\n\n"
-            yield f"data: {json.dumps({'type': 'glow_on'})}\n\n"
+            yield json_dumps({'type': 'chat', 'content': response})
+            yield _FRAME_GLOW_ON
 
         # Only run BERT/sentence-transformers cluster predictor when user has entered analysis mode
         if _has_entered_analysis_mode and sync_predict_cluster and user_question.strip():
@@ -170,8 +245,7 @@ async def stream_simple_chat(user_question: str) -> AsyncGenerator[str, None]:
                 # Use Gemini to extract search keywords from the user message before embedding search
                 search_query = user_question.strip()
                 if agent and agent.gemini_agent:
-                    search_query = await asyncio.to_thread(
-                        agent.gemini_agent.extract_search_keywords,
+                    search_query = await agent.gemini_agent.aextract_search_keywords(
                         user_question.strip(),
                         "matching against municipal service request cluster labels (e.g. Facility Booking, City Hall Room Booking)",
                     )
@@ -179,7 +253,7 @@ async def stream_simple_chat(user_question: str) -> AsyncGenerator[str, None]:
                     sync_predict_cluster,
                     search_query,
                 )
-                yield f"data: {json.dumps({'type': 'cluster_prediction', 'data': {'parent_cluster_id': result['parent_cluster_id'], 'child_cluster_id': result['child_cluster_id'], 'parent_similarity': result['parent_similarity'], 'child_similarity': result['child_similarity']}})}\n\n"
+                yield json_dumps({'type': 'cluster_prediction', 'data': {'parent_cluster_id': result['parent_cluster_id'], 'child_cluster_id': result['child_cluster_id'], 'parent_similarity': result['parent_similarity'], 'child_similarity': result['child_similarity']}})
                 # Short message: which cluster we opened, record count, then that we're investigating
                 parent_id = result.get("parent_cluster_id")
                 child_id = result.get("child_cluster_id")
@@ -193,30 +267,37 @@ async def stream_simple_chat(user_question: str) -> AsyncGenerator[str, None]:
                     msg = f"I've opened \"{parent_label}\"{count_phrase}. I'm going to further investigate these records for context."
                 else:
                     msg = f"I've opened the cluster view{count_phrase}. I'm going to further investigate these records for context."
-                yield f"data: {json.dumps({'type': 'chat', 'content': msg})}\n\n"
+                yield json_dumps({'type': 'chat', 'content': msg})
             except Exception as pred_err:
                 import logging
                 logging.getLogger("uvicorn.error").warning("Cluster prediction failed: %s", pred_err)
         elif not _has_entered_analysis_mode and agent and user_question.strip():
             # Regular LLM call (no BERT load) when analysis mode not yet entered
             try:
-                response_text = await asyncio.to_thread(
-                    agent.gemini_agent.simple_chat,
-                    user_question.strip(),
-                )
+                question = user_question.strip()
+                response_text, q_embedding = None, None
+                if response_cache is not None:
+                    # Near-duplicate questions reuse the previous answer
+                    response_text, q_embedding = await asyncio.to_thread(
+                        response_cache.lookup, question, "simple_chat"
+                    )
+                if response_text is None:
+                    response_text = await agent.gemini_agent.asimple_chat(question)
+                    if response_cache is not None and response_text:
+                        response_cache.store(question, q_embedding, response_text, "simple_chat")
                 if response_text:
-                    yield f"data: {json.dumps({'type': 'chat', 'content': response_text})}\n\n"
+                    yield json_dumps({'type': 'chat', 'content': response_text})
             except Exception as chat_err:
                 import logging
                 logging.getLogger("uvicorn.error").warning("Simple chat failed: %s", chat_err)
 
         # Send completion signal
-        yield f"data: {json.dumps({'type': 'complete', 'content': 'Done'})}\n\n"
+        yield _FRAME_COMPLETE_DONE
 
     except Exception as e:
         error_msg = f"Error: {str(e)}"
-        yield f"data: {json.dumps({'type': 'error', 'content': error_msg})}\n\n"
-        yield f"data: {json.dumps({'type': 'complete', 'content': 'Stream ended'})}\n\n"
+        yield json_dumps({'type': 'error', 'content': error_msg})
+        yield _FRAME_COMPLETE_ENDED
 
 
 async def stream_agent_response(user_question: str) -> AsyncGenerator[str, None]:
@@ -226,35 +307,54 @@ async def stream_agent_response(user_question: str) -> AsyncGenerator[str, None]
     """
     try:
         # Send initial acknowledgment
-        yield f"data: {json.dumps({'type': 'start', 'content': 'Processing your question...'})}\n\n"
-        await asyncio.sleep(0.1)
+        yield _FRAME_START
         
         # STAGE 1: Planning
-        yield f"data: {json.dumps({'type': 'thought', 'content': '🤔 Analyzing your question and planning which data to use...'})}\n\n"
-        await asyncio.sleep(0.5)
-        
-        # Get catalog and frequency preview
-        catalog_summary = agent.catalog_summary
-        frequency_preview = agent._get_frequency_preview()
-        
-        # Generate plan
-        plan = agent.gemini_agent.plan_stage(
-            user_question=user_question,
-            catalog_summary=catalog_summary,
-            frequency_data_preview=frequency_preview
-        )
-        
-        # Send plan to frontend
-        yield f"data: {json.dumps({'type': 'plan', 'content': 'Selected data products:', 'data': {'plan': plan}})}\n\n"
-        await asyncio.sleep(0.3)
+        yield _FRAME_PLANNING
         
+        # Planning context is precomputed at startup (see _cache_catalog_on_startup);
+        # fall back to a live build if the startup hook didn't populate it
+        catalog_summary = getattr(app.state, "catalog_summary", "") or agent.catalog_summary
+        frequency_preview = getattr(app.state, "frequency_preview", "") or agent._get_frequency_preview()
+
+        # Semantic cache first: near-duplicate questions reuse an earlier plan.
+        # The namespace hashes the planning context so cached plans go stale
+        # whenever the catalog or frequency preview changes.
+        plan, q_embedding, plan_ns = None, None, None
+        if response_cache is not None:
+            ctx_hash = hashlib.md5(
+                (catalog_summary + frequency_preview).encode("utf-8")
+            ).hexdigest()[:12]
+            plan_ns = f"plan:{ctx_hash}"
+            plan, q_embedding = await asyncio.to_thread(
+                response_cache.lookup, user_question, plan_ns
+            )
+
+        if plan is None:
+            # Generate plan (native async; doesn't block other streams)
+            plan = await agent.gemini_agent.aplan_stage(
+                user_question=user_question,
+                catalog_summary=catalog_summary,
+                frequency_data_preview=frequency_preview
+            )
+            if response_cache is not None and plan:
+                response_cache.store(user_question, q_embedding, plan, plan_ns)
+
+        # Send plan to frontend (constant envelope pre-serialized at module load)
+        yield _PLAN_FRAME_PREFIX + json_dumps(plan) + _PLAN_FRAME_SUFFIX
+
         # STAGE 2: Fetch data
         product_ids = [item["product"] for item in plan]
-        
+
+        # Kick off the summary loads now so the disk reads overlap with the
+        # per-product/navigation events streamed below
+        fetch_task = asyncio.create_task(
+            asyncio.to_thread(agent.data_loader.load_multiple_summaries, product_ids)
+        )
+
         for item in plan:
             product_name = item["product"]
-            yield f"data: {json.dumps({'type': 'thought', 'content': f'📊 Loading {product_name}...'})}\n\n"
-            await asyncio.sleep(0.2)
+            yield _loading_frame(product_name)
         
         # Determine which navigation is needed
         navigation_mapping = {
@@ -281,50 +381,48 @@ async def stream_agent_response(user_question: str) -> AsyncGenerator[str, None]
             for key, url in navigation_mapping.items():
                 if key in product_id:
                     if url not in navigated_pages:
-                        yield f"data: {json.dumps({'type': 'navigation', 'content': f'Navigating to {key} view', 'data': {'url': url}})}\n\n"
+                        yield json_dumps({'type': 'navigation', 'content': f'Navigating to {key} view', 'data': {'url': url}})
                         navigated_pages.add(url)
                         display_name = key_to_display.get(key, key.replace("_", " ").title())
                         if display_name not in navigated_view_names:
                             navigated_view_names.append(display_name)
-                        await asyncio.sleep(0.5)
 
         # After navigation: discuss where we went and that we're investigating
         if navigated_view_names:
             views_str = " and ".join(navigated_view_names)
-            yield f"data: {json.dumps({'type': 'chat', 'content': f'I\'ve opened the {views_str} view. I\'m going to further investigate my records.'})}\n\n"
-            await asyncio.sleep(0.2)
-        
-        # Load data
-        fetched_data_summaries = agent.data_loader.load_multiple_summaries(product_ids)
+            yield json_dumps({'type': 'chat', 'content': f'I\'ve opened the {views_str} view. I\'m going to further investigate my records.'})
         
+        # Join the prefetch started right after planning (usually done by now)
+        fetched_data_summaries = await fetch_task
+
         if not fetched_data_summaries:
             # Fall back to loading raw data
-            yield f"data: {json.dumps({'type': 'thought', 'content': 'Loading raw data (no summaries available)...'})}\n\n"
-            await asyncio.sleep(0.2)
-            fetched_data_summaries = agent.data_loader.load_multiple_products(product_ids)
-        
+            yield _FRAME_RAW_DATA
+            fetched_data_summaries = await asyncio.to_thread(
+                agent.data_loader.load_multiple_products, product_ids
+            )
+
         # STAGE 3: Analysis
-        yield f"data: {json.dumps({'type': 'thought', 'content': '🧠 Analyzing data and generating insights...'})}\n\n"
-        await asyncio.sleep(0.5)
-        
+        yield _FRAME_ANALYZING
+
         # Generate final answer
-        answer_data = agent.gemini_agent.analysis_stage(
+        answer_data = await agent.gemini_agent.aanalysis_stage(
             user_question=user_question,
             access_log=plan,
             fetched_data=fetched_data_summaries
         )
-        
+
         # Send final answer
-        yield f"data: {json.dumps({'type': 'answer', 'content': answer_data['answer'], 'data': {'rationale': answer_data.get('rationale', []), 'key_metrics': answer_data.get('key_metrics', [])}})}\n\n"
+        yield json_dumps({'type': 'answer', 'content': answer_data['answer'], 'data': {'rationale': answer_data.get('rationale', []), 'key_metrics': answer_data.get('key_metrics', [])}})
         
         # Send completion signal
-        yield f"data: {json.dumps({'type': 'complete', 'content': 'Analysis complete'})}\n\n"
+        yield _FRAME_COMPLETE_ANALYSIS
         
     except Exception as e:
         error_msg = f"Error processing request: {str(e)}"
-        yield f"data: {json.dumps({'type': 'error', 'content': error_msg})}\n\n"
+        yield json_dumps({'type': 'error', 'content': error_msg})
         # Ensure stream closes even after error
-        yield f"data: {json.dumps({'type': 'complete', 'content': 'Stream ended'})}\n\n"
+        yield _FRAME_COMPLETE_ENDED
 
 
 @app.get("/")
@@ -366,15 +464,9 @@ async def chat_stream(request: ChatRequest):
     else:
         stream_func = stream_simple_chat(request.message)
     
-    return StreamingResponse(
-        stream_func,
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no"  # Disable nginx buffering
-        }
-    )
+    # EventSourceResponse handles SSE framing, no-cache/no-buffering headers,
+    # and keep-alive pings (so proxies don't time out quiet streams)
+    return EventSourceResponse(stream_func, ping=15, send_timeout=5)
 
 
 class ClusterPredictRequest(BaseModel):
@@ -413,6 +505,17 @@ KEY_TO_DISPLAY = {
 }
 
 
+def _fetch_cluster_labels(parent_id: int, child_id: int) -> tuple:
+    """Blocking DB lookup of cluster labels (call via asyncio.to_thread)"""
+    conn = get_conn()
+    try:
+        return get_cluster_labels(conn, parent_id, child_id or 0)
+    finally:
+        # Return the connection to the pool; close() would permanently burn
+        # one of its slots
+        put_conn(conn)
+
+
 @app.post("/api/chat/analytics-visit")
 async def analytics_visit(request: AnalyticsVisitRequest):
     """
@@ -432,20 +535,15 @@ async def analytics_visit(request: AnalyticsVisitRequest):
         )
     parent_id = request.parent_cluster_id
     child_id = request.child_cluster_id
-    conn = get_conn()
-    try:
-        parent_label, child_label = get_cluster_labels(
-            conn, parent_id, child_id or 0
-        )
-    finally:
-        conn.close()
+    parent_label, child_label = await asyncio.to_thread(
+        _fetch_cluster_labels, parent_id, child_id
+    )
     parent_label = parent_label or f"cluster {parent_id}"
     child_label = child_label or f"sub-cluster {child_id}"
 
     # Plan: pick one analytics-linked data product for this cluster (README flow)
-    frequency_preview = agent._get_frequency_preview()
-    plan = await asyncio.to_thread(
-        agent.gemini_agent.plan_one_analytics_product_for_cluster,
+    frequency_preview = getattr(app.state, "frequency_preview", "") or agent._get_frequency_preview()
+    plan = await agent.gemini_agent.aplan_one_analytics_product_for_cluster(
         parent_label,
         child_label,
         agent.catalog_summary,
@@ -464,19 +562,28 @@ async def analytics_visit(request: AnalyticsVisitRequest):
         product_id, product_id.replace("_", " ").title()
     )
 
-    # Load that product's data summary for the discussion
-    summaries = agent.data_loader.load_multiple_summaries([product_id])
+    # Load that product's data summary for the discussion (off the event loop;
+    # a cold load parses the CSV)
+    summaries = await asyncio.to_thread(
+        agent.data_loader.load_multiple_summaries, [product_id]
+    )
     data_summary = (summaries or {}).get(product_id, "")
     if not data_summary:
-        dfs = agent.data_loader.load_multiple_products([product_id])
+        dfs = await asyncio.to_thread(
+            agent.data_loader.load_multiple_products, [product_id]
+        )
         data_summary = ""
         if dfs and product_id in dfs and dfs[product_id] is not None:
             data_summary = agent.data_loader.get_data_summary(
                 dfs[product_id], max_rows=30
             )
 
-    discussion = await asyncio.to_thread(
-        agent.gemini_agent.discuss_analytics_visit,
+    # Truncate at generation time so the oversized tail never crosses the
+    # thread boundary; the discuss prompt caps at MAX_SUMMARY chars anyway
+    if len(data_summary) > MAX_SUMMARY:
+        data_summary = data_summary[:MAX_SUMMARY]
+
+    discussion = await agent.gemini_agent.adiscuss_analytics_visit(
         parent_label,
         child_label,
         product_id,
@@ -522,28 +629,22 @@ async def report_generate(request: ReportGenerateRequest):
     child_id = request.child_cluster_id
     discussion = (request.discussion or "").strip()
 
-    conn = get_conn()
-    try:
-        parent_label, child_label = get_cluster_labels(
-            conn, parent_id, child_id or 0
-        )
-    finally:
-        conn.close()
+    parent_label, child_label = await asyncio.to_thread(
+        _fetch_cluster_labels, parent_id, child_id
+    )
     parent_label = parent_label or f"cluster {parent_id}"
     child_label = child_label or f"sub-cluster {child_id}"
 
     # Build report input: answer, rationale, key_metrics (required by ReportGenerator per README)
-    report_data = await asyncio.to_thread(
-        agent.gemini_agent.report_data_from_discussion,
+    report_data = await agent.gemini_agent.areport_data_from_discussion(
         parent_label,
         child_label,
         discussion,
     )
 
     # Add products so report can render "Supporting Data Analysis" with CSV-based charts (README)
-    frequency_preview = agent._get_frequency_preview()
-    plan = await asyncio.to_thread(
-        agent.gemini_agent.plan_one_analytics_product_for_cluster,
+    frequency_preview = getattr(app.state, "frequency_preview", "") or agent._get_frequency_preview()
+    plan = await agent.gemini_agent.aplan_one_analytics_product_for_cluster(
         parent_label,
         child_label,
         agent.catalog_summary,
@@ -755,8 +856,8 @@ async def speech_to_text_stream(request: STTStreamChunk):
     
     async def generate_transcription():
         try:
-            # Decode audio chunk
-            audio_data = base64.b64decode(request.audio_chunk)
+            # Decode audio chunk off the event loop (CPU-bound for large blobs)
+            audio_data = await asyncio.to_thread(base64.b64decode, request.audio_chunk)
             print(f"🎤 STT stream chunk: format={request.input_format}, size={len(audio_data)} bytes, final={request.is_final}")
 
             # Create async generator for this chunk
@@ -775,27 +876,19 @@ async def speech_to_text_stream(request: STTStreamChunk):
                 if message.get("type") == "text":
                     text = message.get("text", "")
                     print(f"📝 Stream transcript: {text}")
-                    sse_line = json.dumps({"type": "transcript", "text": text, "is_final": request.is_final})
+                    sse_line = json_dumps({"type": "transcript", "text": text, "is_final": request.is_final})
                     print(f"[STT] SSE out: data: {sse_line}")
-                    yield f"data: {sse_line}\n\n"
+                    yield sse_line
 
             if request.is_final:
-                yield f"data: {json.dumps({'type': 'complete'})}\n\n"
+                yield json_dumps({'type': 'complete'})
                 print("[STT] SSE out: data: complete")
 
         except Exception as e:
             print(f"❌ STT stream error: {str(e)}")
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            yield json_dumps({'type': 'error', 'message': str(e)})
     
-    return StreamingResponse(
-        generate_transcription(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no"
-        }
-    )
+    return EventSourceResponse(generate_transcription(), ping=15, send_timeout=5)
 
 
 @app.post("/api/voice/stt")
@@ -808,8 +901,10 @@ async def speech_to_text(request: STTRequest):
         raise HTTPException(status_code=500, detail="Gradium client not initialized. Check GRADIUM_API_KEY in .env")
     
     try:
-        # Decode base64 audio data
-        audio_data = base64.b64decode(request.audio_data)
+        # Decode base64 audio data in a worker thread: a multi-MB upload takes
+        # tens of ms to decode, which would stall every other stream if run
+        # directly on the event loop
+        audio_data = await asyncio.to_thread(base64.b64decode, request.audio_data)
         print(f"🎤 STT request: format={request.input_format}, size={len(audio_data)} bytes")
         
         # Gradium accepts only wav, pcm, opus
@@ -855,4 +950,24 @@ async def speech_to_text(request: STTRequest):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
+
+    # uvloop + httptools are uvicorn's fast event loop / HTTP parser pair;
+    # fall back to the stdlib implementations when they aren't installed
+    try:
+        import uvloop
+        uvloop.install()
+        _loop, _http = "uvloop", "httptools"
+    except ImportError:
+        _loop, _http = "auto", "auto"
+
+    # reload=True spawns a file-watcher subprocess and forces the default loop;
+    # keep it off unless explicitly requested for development
+    _reload = os.getenv("UVICORN_RELOAD") == "1"
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop=_loop,
+        http=_http,
+        reload=_reload,
+    )
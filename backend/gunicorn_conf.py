@@ -0,0 +1,46 @@
+"""
+Gunicorn configuration for running the FastAPI backend in production.
+
+The dev entrypoint (python -m app.main) runs a single uvicorn process; under
+gunicorn each worker is a full uvicorn event loop, so requests that block one
+worker (Gemini calls, report generation) don't stall the whole API.
+
+Usage (from backend/):
+
+    gunicorn app.main:app -c gunicorn_conf.py
+"""
+
+import multiprocessing
+
+bind = "0.0.0.0:8000"
+
+# Async uvicorn workers: each handles many concurrent SSE/voice streams
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = multiprocessing.cpu_count() * 2 + 1
+worker_connections = 1000
+
+# Keep client connections open briefly between requests (frontend polls + SSE
+# reconnects reuse the socket instead of paying a new TCP/TLS handshake)
+keepalive = 5
+
+# Import the app once in the master before forking: workers share the loaded
+# catalog/summaries pages via copy-on-write instead of re-importing per worker
+preload_app = True
+
+
+def post_fork(server, worker):
+    """
+    Re-run agent warmup in each worker.
+
+    With preload_app the agent's warmup daemon thread starts in the master
+    and doesn't survive the fork; a worker forked before warmup finished
+    inherits an unset _warmup_done event, and every query() would then block
+    the full 5s warmup wait. _warmup is idempotent and always sets the event.
+    """
+    try:
+        from app import main
+    except Exception:
+        return
+    if main.agent is not None:
+        import threading
+        threading.Thread(target=main.agent._warmup, daemon=True).start()
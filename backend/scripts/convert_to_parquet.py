@@ -0,0 +1,90 @@
+"""
+One-shot conversion of the trends/data CSVs to ZSTD-compressed Parquet.
+
+Parquet files are written alongside the CSVs (same stem, .parquet suffix).
+top10.csv is partitioned by ranking_type so the four top10_* catalog products
+only read their own partition instead of scanning the whole file.
+
+Usage: python convert_to_parquet.py
+"""
+
+import shutil
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_path))
+
+from agent.catalog import DATA_CATALOG
+from agent.data_loader import DataLoader
+
+# Files that benefit from hive-style partitioning (column -> partition key)
+PARTITIONED_FILES = {
+    "top10.csv": "ranking_type",
+}
+
+
+def convert_all(data_dir: Path = None):
+    """Convert every catalog CSV to Parquet, partitioning where configured"""
+    if data_dir is None:
+        data_dir = DataLoader().data_dir
+
+    csv_files = sorted({details["file"] for details in DATA_CATALOG.values()})
+
+    print("=" * 80)
+    print("Converting CSVs to Parquet (ZSTD)")
+    print("=" * 80)
+    print(f"Data directory: {data_dir}\n")
+
+    successful = 0
+    failed = 0
+
+    for csv_name in csv_files:
+        csv_path = data_dir / csv_name
+        parquet_path = csv_path.with_suffix(".parquet")
+
+        if not csv_path.exists():
+            print(f"  ⚠️  Skipping {csv_name} (not found)")
+            failed += 1
+            continue
+
+        try:
+            df = pd.read_csv(csv_path)
+            partition_col = PARTITIONED_FILES.get(csv_name)
+
+            if partition_col and partition_col in df.columns:
+                # Partitioned output is a directory of hive-style subdirs
+                if parquet_path.exists():
+                    shutil.rmtree(parquet_path) if parquet_path.is_dir() else parquet_path.unlink()
+                df.to_parquet(
+                    parquet_path,
+                    engine="pyarrow",
+                    compression="zstd",
+                    partition_cols=[partition_col],
+                    index=False,
+                )
+                print(f"  ✅ {csv_name} -> {parquet_path.name}/ (partitioned by {partition_col})")
+            else:
+                df.to_parquet(
+                    parquet_path,
+                    engine="pyarrow",
+                    compression="zstd",
+                    index=False,
+                )
+                print(f"  ✅ {csv_name} -> {parquet_path.name} ({df.shape[0]} rows)")
+
+            successful += 1
+
+        except Exception as e:
+            print(f"  ❌ Error converting {csv_name}: {e}")
+            failed += 1
+
+    print(f"\n✅ Converted: {successful}, ❌ Failed: {failed}")
+    return successful, failed
+
+
+if __name__ == "__main__":
+    convert_all()